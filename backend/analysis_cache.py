@@ -0,0 +1,183 @@
+"""
+Analiz sonuçları için içerik adresli önbellek (bellek içi LRU + opsiyonel SQLite katmanı)
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+import asyncio
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def normalize_conversation(text: str) -> str:
+    """Anahtar üretimi için konuşma metnini normalize et (boşluk farklarını yok say)"""
+    lines = [" ".join(line.split()) for line in text.strip().splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def make_cache_key(conversation_text: str, version: str) -> str:
+    """Normalize edilmiş metin + prompt/model versiyonundan SHA-256 anahtar üret"""
+    payload = f"{version}\x00{normalize_conversation(conversation_text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Parse edilmiş analiz JSON'larını saklayan iki katmanlı önbellek.
+    Bellek katmanı event loop'ta çalışır; SQLite okuma/yazmaları tek bir arka plan
+    thread'ine gider ve yazmalar o thread meşgulken birikip tek commit ile yazılır.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path or None
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_pool: Optional[ThreadPoolExecutor] = None
+        self._pending_writes: Dict[str, tuple] = {}
+        self._flush_scheduled = False
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_writes = 0
+        self.disk_commits = 0
+        self.purged = 0
+
+        if self.db_path:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            # SQLite bağlantısı sadece bu thread'den kullanılır
+            self._disk_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis-cache")
+
+    def _memory_get(self, key: str, now: float) -> Optional[Dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if now - created_at <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                return copy.deepcopy(value)
+            del self._memory[key]
+            return None
+
+    async def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        if self._disk_pool is not None:
+            row = await asyncio.get_running_loop().run_in_executor(self._disk_pool, self._disk_get, key)
+            if row and now - row[1] <= self.ttl_seconds:
+                value = json.loads(row[0])
+                with self._lock:
+                    self._store_memory(key, value, row[1])
+                self.hits += 1
+                self.disk_hits += 1
+                return copy.deepcopy(value)
+
+        self.misses += 1
+        return None
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        try:
+            return self._db.execute(
+                "SELECT value, created_at FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Analysis cache read error: {e}")
+            return None
+
+    def set(self, key: str, value: Dict):
+        """Bellek katmanına hemen yazar; disk yazması arka plandaki bir sonraki toplu commit'e eklenir"""
+        now = time.time()
+        with self._lock:
+            self._store_memory(key, copy.deepcopy(value), now)
+            if self._disk_pool is None:
+                return
+            self._pending_writes[key] = (json.dumps(value, ensure_ascii=False), now)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self._disk_pool.submit(self._flush_writes)
+
+    def _flush_writes(self):
+        with self._lock:
+            pending, self._pending_writes = self._pending_writes, {}
+            self._flush_scheduled = False
+        if not pending or self._db is None:
+            return
+        try:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO analysis_cache (key, value, created_at) VALUES (?, ?, ?)",
+                [(key, value, created_at) for key, (value, created_at) in pending.items()]
+            )
+            self._db.commit()
+            self.disk_writes += len(pending)
+            self.disk_commits += 1
+        except sqlite3.Error as e:
+            print(f"Analysis cache write error: {e}")
+
+    def _store_memory(self, key: str, value: Dict, created_at: float):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def purge_expired(self) -> int:
+        """Süresi dolmuş disk kayıtlarını temizle (arka plan thread'inde)"""
+        if self._disk_pool is None:
+            return 0
+        return await asyncio.get_running_loop().run_in_executor(self._disk_pool, self._purge_expired)
+
+    def _purge_expired(self) -> int:
+        try:
+            cursor = self._db.execute(
+                "DELETE FROM analysis_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Analysis cache purge error: {e}")
+            return 0
+        self.purged += cursor.rowcount
+        return cursor.rowcount
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "disk_enabled": self._db is not None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "pending_disk_writes": len(self._pending_writes),
+            "disk_writes": self.disk_writes,
+            "disk_commits": self.disk_commits,
+            "purged": self.purged
+        }
+
+    def close(self):
+        """Bekleyen yazmaları diske aktar ve bağlantıyı kapat"""
+        if self._disk_pool is not None:
+            self._disk_pool.submit(self._flush_writes)
+            self._disk_pool.shutdown(wait=True)
+            self._disk_pool = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,126 @@
+"""
+Akış halinde gelen model çıktısından ANALYSIS_PROMPT JSON alanlarını artımlı olarak çıkaran parser
+"""
+from typing import Dict, List, Optional
+import json
+
+WHITESPACE = " \t\r\n"
+
+
+class AnalysisStreamParser:
+    """
+    Token token gelen JSON metnini tarar ve tamamlanan alanları olay olarak döner.
+
+    - Üst seviye alanlar (sentiment, resolution, agentPerformance, metrics...) değerleri
+      kapandığı anda {"field": ad, "value": değer} olarak çıkar.
+    - "insights" dizisinin her elemanı kapandığı anda
+      {"field": "insights", "index": i, "value": {...}} olarak çıkar.
+    - Kök nesneden önceki ```json gibi ön ekler yok sayılır.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._root_start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expecting_key = False
+        self._awaiting_value = False
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self._item_start: Optional[int] = None
+        self._insight_index = 0
+        self.done = False
+        self.fields: Dict = {}
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Yeni metin parçasını işle, bu parçayla tamamlanan alanları döndür"""
+        self.text += chunk
+        events: List[Dict] = []
+        text = self.text
+
+        while self._pos < len(text) and not self.done:
+            pos = self._pos
+            c = text[pos]
+            self._pos += 1
+
+            if self._root_start is None:
+                if c == "{":
+                    self._root_start = pos
+                    self._depth = 1
+                    self._expecting_key = True
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expecting_key:
+                        self._key = self._decode(text[self._string_start:pos + 1])
+                        self._expecting_key = False
+                continue
+
+            if self._depth == 1 and self._awaiting_value and c not in WHITESPACE:
+                self._awaiting_value = False
+                self._value_start = pos
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif c in "{[":
+                if self._depth == 2 and self._key == "insights" and c == "{":
+                    self._item_start = pos
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 2 and self._key == "insights" and self._item_start is not None:
+                    self._emit_insight(text[self._item_start:pos + 1], events)
+                    self._item_start = None
+                elif self._depth == 1 and self._value_start is not None:
+                    self._emit_field(text[self._value_start:pos + 1], events)
+                elif self._depth == 0:
+                    if self._value_start is not None:
+                        self._emit_field(text[self._value_start:pos], events)
+                    self.done = True
+            elif self._depth == 1:
+                if c == ":":
+                    self._awaiting_value = True
+                elif c == ",":
+                    if self._value_start is not None:
+                        self._emit_field(text[self._value_start:pos], events)
+                    self._expecting_key = True
+
+        return events
+
+    def _emit_field(self, raw: str, events: List[Dict]):
+        self._value_start = None
+        key = self._key
+        if key is None:
+            return
+        try:
+            value = json.loads(raw.strip())
+        except json.JSONDecodeError:
+            return
+        self.fields[key] = value
+        if key != "insights":
+            events.append({"field": key, "value": value})
+
+    def _emit_insight(self, raw: str, events: List[Dict]):
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        events.append({"field": "insights", "index": self._insight_index, "value": value})
+        self._insight_index += 1
+
+    @staticmethod
+    def _decode(raw: str) -> Optional[str]:
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            return None
@@ -0,0 +1,102 @@
+"""
+Tur bazlı, sınırlı konuşma buffer'ı (string birleştirme yerine append-only kayıt listesi)
+"""
+from collections import deque
+from datetime import datetime
+from typing import Deque, List, NamedTuple, Optional
+
+# Frontend mesajları "Müşteri: ..." / "Temsilci: ..." önekiyle gönderiyor
+ROLE_PREFIXES = {
+    "Müşteri": "customer",
+    "Temsilci": "agent"
+}
+
+# Token bütçesi için kaba tahmin (Türkçe metinde ~4 karakter / token)
+CHARS_PER_TOKEN = 4
+
+
+class Turn(NamedTuple):
+    role: str
+    text: str
+    timestamp: datetime
+    line: str  # Prompt'a giden orijinal satır ("Müşteri: ...")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class ConversationBuffer:
+    """
+    Bir görüşmenin (role, text, timestamp) kayıtları.
+
+    - max_turns / max_chars aşılınca en eski turlar atılır.
+    - render() sonucu bir sonraki eklemeye kadar önbellekte tutulur.
+    - render(max_tokens=...) sadece bütçeye sığan en yeni turları döndürür.
+    """
+
+    def __init__(self, max_turns: int = 500, max_chars: int = 200_000):
+        self.max_turns = max_turns
+        self.max_chars = max_chars
+        self.turns: Deque[Turn] = deque()
+        self.total_chars = 0
+        self.non_blank_turns = 0
+        self.version = 0  # Her değişiklikte artar (yeni metin geldi mi kontrolü için)
+        self._rendered: Optional[str] = None
+
+    def append(self, text: str, default_role: str = "unknown") -> Turn:
+        role, content = default_role, text
+        for prefix, prefix_role in ROLE_PREFIXES.items():
+            if text.startswith(f"{prefix}:"):
+                role, content = prefix_role, text[len(prefix) + 1:].strip()
+                break
+
+        turn = Turn(role=role, text=content, timestamp=datetime.now(), line=text)
+        self.turns.append(turn)
+        self.total_chars += len(text) + 1
+        self.non_blank_turns += bool(text.strip())
+
+        while self.turns and (len(self.turns) > self.max_turns or self.total_chars > self.max_chars):
+            dropped = self.turns.popleft()
+            self.total_chars -= len(dropped.line) + 1
+            self.non_blank_turns -= bool(dropped.line.strip())
+
+        self.version += 1
+        self._rendered = None
+        return turn
+
+    def render(self, max_tokens: Optional[int] = None) -> str:
+        """Prompt metni (her tur bir satır)"""
+        if max_tokens is None:
+            if self._rendered is None:
+                self._rendered = "".join(turn.line + "\n" for turn in self.turns)
+            return self._rendered
+        if self.total_chars // CHARS_PER_TOKEN <= max_tokens:
+            return self.render()
+
+        lines: List[str] = []
+        budget = max_tokens
+        for turn in reversed(self.turns):
+            cost = estimate_tokens(turn.line)
+            if cost > budget and lines:
+                break
+            lines.append(turn.line + "\n")
+            budget -= cost
+        return "".join(reversed(lines))
+
+    def messages(self, role: str) -> List[str]:
+        """Belirli bir rolün mesaj metinleri (kaydetme/analiz için, yeniden parse etmeden)"""
+        return [turn.text for turn in self.turns if turn.role == role]
+
+    def is_empty(self) -> bool:
+        return self.non_blank_turns == 0
+
+    def clear(self):
+        self.turns.clear()
+        self.total_chars = 0
+        self.non_blank_turns = 0
+        self.version += 1
+        self._rendered = None
+
+    def __len__(self) -> int:
+        return len(self.turns)
@@ -0,0 +1,221 @@
+"""
+Senkron SQLAlchemy işlerini event loop dışında, ayrılmış thread havuzlarında çalıştırma
+
+- Okuma havuzu: admin/analitik sorguları (DB_READ_THREADS eşzamanlı okuyucu)
+- Tek yazıcı: konuşma kayıtları kuyruğa girer, arka plandaki yazıcı thread'i bunları
+  gruplar ve tek commit ile yazar (SQLite'ta "database is locked" ve kayıt başına fsync yok)
+Okuma işleri kendi session'ını açar ve kapatır.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+import asyncio
+import functools
+import os
+import queue
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, engine
+
+DB_READ_THREADS = int(os.getenv("DB_READ_THREADS", "4"))
+# Grup commit: en fazla DB_WRITE_BATCH_SIZE kayıt, ilk kayıttan en fazla DB_WRITE_MAX_DELAY_MS sonra commit
+# (bir kaydın commit edilmeden bekleyebileceği süre = dayanıklılık sınırı)
+DB_WRITE_BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", "64"))
+DB_WRITE_MAX_DELAY_MS = float(os.getenv("DB_WRITE_MAX_DELAY_MS", "50"))
+
+T = TypeVar("T")
+
+
+class DBExecutor:
+    """Tek bir thread havuzu + kuyruk/işlenen iş sayaçları"""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"db-{name}")
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """fn(db, *args, **kwargs) çağrısını havuzda yeni bir session ile çalıştır"""
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            result = await loop.run_in_executor(self.pool, functools.partial(_with_session, fn, args, kwargs))
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        return result
+
+    def stats(self) -> Dict:
+        return {
+            "threads": self.max_workers,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
+
+
+WriteJob = Tuple[Callable, tuple, dict, Future]
+
+
+class BatchWriter:
+    """
+    Tek arka plan yazıcı thread'i.
+
+    İşler fn(db, *args, **kwargs) şeklindedir ve commit etmemelidir; yazıcı bir grubu
+    aynı transaction'da çalıştırıp tek commit yapar. submit() commit sonrası döner.
+    Grup içinde bir iş hata verirse grup geri alınır ve işler tek tek yeniden denenir,
+    böylece hatalı kayıt diğerlerini düşürmez.
+    """
+
+    def __init__(self, batch_size: int, max_delay_ms: float):
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max(0.0, max_delay_ms) / 1000
+        self.queue: "queue.Queue[Optional[WriteJob]]" = queue.Queue()
+        self.batches = 0
+        self.committed = 0
+        self.failed = 0
+        self.retried_batches = 0
+        self.last_batch_size = 0
+        self.last_commit_ms = 0.0
+        self.max_batch_size = 0
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    async def submit(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        future: Future = Future()
+        self.queue.put((fn, args, kwargs, future))
+        return await asyncio.wrap_future(future)
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            batch: List[WriteJob] = [job]
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    job = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+            self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[WriteJob]):
+        started = time.perf_counter()
+        db: Session = SessionLocal(expire_on_commit=False)
+        try:
+            results = [fn(db, *args, **kwargs) for fn, args, kwargs, _ in batch]
+            db.commit()
+        except Exception:
+            db.rollback()
+            results = None
+        finally:
+            db.close()
+
+        if results is None:
+            self.retried_batches += 1
+            for job in batch:
+                self._write_single(job)
+            return
+
+        self.batches += 1
+        self.committed += len(batch)
+        self.last_batch_size = len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+        self.last_commit_ms = (time.perf_counter() - started) * 1000
+        for (_, _, _, future), result in zip(batch, results):
+            if not future.done():  # Bekleyen taraf iptal edilmiş olabilir
+                future.set_result(result)
+
+    def _write_single(self, job: WriteJob):
+        fn, args, kwargs, future = job
+        db: Session = SessionLocal(expire_on_commit=False)
+        try:
+            result = fn(db, *args, **kwargs)
+            db.commit()
+            self.committed += 1
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            db.rollback()
+            self.failed += 1
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self.queue.qsize(),
+            "batches": self.batches,
+            "committed": self.committed,
+            "failed": self.failed,
+            "retried_batches": self.retried_batches,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "last_commit_ms": round(self.last_commit_ms, 2),
+            "batch_size": self.batch_size,
+            "max_delay_ms": self.max_delay * 1000
+        }
+
+    def shutdown(self):
+        """Kuyrukta kalan kayıtları yazıp thread'i durdur"""
+        self.queue.put(None)
+        self._thread.join()
+
+
+def _with_session(fn: Callable[..., T], args: tuple, kwargs: dict) -> T:
+    db: Session = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+read_executor = DBExecutor("read", DB_READ_THREADS)
+writer = BatchWriter(DB_WRITE_BATCH_SIZE, DB_WRITE_MAX_DELAY_MS)
+
+
+async def run_db_read(fn: Callable[..., T], *args, **kwargs) -> T:
+    return await read_executor.run(fn, *args, **kwargs)
+
+
+async def run_db_write(fn: Callable[..., T], *args, **kwargs) -> T:
+    """fn(db, ...) commit etmeden yazar; grup commit tamamlanınca sonucu döner"""
+    return await writer.submit(fn, *args, **kwargs)
+
+
+def db_stats() -> Dict:
+    return {
+        "read": read_executor.stats(),
+        "write": writer.stats(),
+        "pool": {
+            "size": engine.pool.size(),
+            "checked_out": engine.pool.checkedout(),
+            "overflow": engine.pool.overflow()
+        }
+    }
+
+
+def shutdown_db_executors():
+    read_executor.shutdown()
+    writer.shutdown()
@@ -0,0 +1,172 @@
+"""
+Embedding önbelleği: içerik hash'i -> vektör (bellek içi LRU + model başına memory-mapped disk deposu)
+
+Disk düzeni (EMBEDDING_CACHE_DIR/<model>/):
+- meta.json   : boyut ve dtype (float16 / float32)
+- keys.bin    : satır başına 32 byte SHA-256 özeti
+- vectors.bin : satır başına dim * itemsize byte, np.memmap ile okunur
+Dosyalar sadece sona eklenir; yarım kalan son satır açılışta yok sayılır.
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+KEY_BYTES = 32
+DTYPES = {"float16": np.float16, "float32": np.float32}
+
+
+def embedding_key(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class DiskVectorStore:
+    """Tek model için sona eklemeli, memory-mapped vektör deposu"""
+
+    def __init__(self, directory: str, dtype: str = "float16"):
+        self.directory = directory
+        self.dtype_name = dtype if dtype in DTYPES else "float16"
+        self.dim: Optional[int] = None
+        self.index: Dict[bytes, int] = {}
+        self._mmap: Optional[np.memmap] = None
+        self._keys_path = os.path.join(directory, "keys.bin")
+        self._vectors_path = os.path.join(directory, "vectors.bin")
+        self._meta_path = os.path.join(directory, "meta.json")
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @property
+    def dtype(self):
+        return DTYPES[self.dtype_name]
+
+    def _row_bytes(self) -> int:
+        return self.dim * np.dtype(self.dtype).itemsize
+
+    def _load(self):
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        self.dtype_name = meta["dtype"]
+
+        keys = open(self._keys_path, "rb").read() if os.path.exists(self._keys_path) else b""
+        vector_size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        rows = min(len(keys) // KEY_BYTES, vector_size // self._row_bytes())
+
+        # Yarım yazılmış satırları kes (çökme sonrası)
+        with open(self._keys_path, "ab") as f:
+            f.truncate(rows * KEY_BYTES)
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(rows * self._row_bytes())
+
+        self.index = {keys[i * KEY_BYTES:(i + 1) * KEY_BYTES]: i for i in range(rows)}
+
+    def _vectors(self) -> Optional[np.memmap]:
+        rows = len(self.index)
+        if rows == 0:
+            return None
+        if self._mmap is None or self._mmap.shape[0] < rows:
+            self._mmap = np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=(rows, self.dim))
+        return self._mmap
+
+    def get(self, key: bytes) -> Optional[List[float]]:
+        row = self.index.get(key)
+        if row is None:
+            return None
+        return self._vectors()[row].astype(np.float32).tolist()
+
+    def put_many(self, items: Sequence[tuple]):
+        """[(key, vektör), ...] ekle; boyutu farklı vektörler atlanır"""
+        items = [(key, vector) for key, vector in items if key not in self.index]
+        if not items:
+            return
+        if self.dim is None:
+            self.dim = len(items[0][1])
+            with open(self._meta_path, "w") as f:
+                json.dump({"dim": self.dim, "dtype": self.dtype_name}, f)
+        items = [(key, vector) for key, vector in items if len(vector) == self.dim]
+        if not items:
+            return
+
+        matrix = np.asarray([vector for _, vector in items], dtype=self.dtype)
+        with open(self._vectors_path, "ab") as f:
+            f.write(matrix.tobytes())
+        with open(self._keys_path, "ab") as f:
+            f.write(b"".join(key for key, _ in items))
+        start = len(self.index)
+        for offset, (key, _) in enumerate(items):
+            self.index[key] = start + offset
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+class EmbeddingCache:
+    """Bellek içi LRU + disk deposu; model adıyla ayrılır"""
+
+    def __init__(self, model: str, max_entries: int = 10_000, directory: Optional[str] = None, dtype: str = "float16"):
+        self.model = model
+        self.max_entries = max_entries
+        self.memory: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self.disk: Optional[DiskVectorStore] = None
+        if directory:
+            safe_model = re.sub(r"[^A-Za-z0-9._-]+", "_", model)
+            self.disk = DiskVectorStore(os.path.join(directory, safe_model), dtype)
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Her metin için önbellekteki vektör veya None"""
+        results: List[Optional[List[float]]] = []
+        with self._lock:
+            for text in texts:
+                key = embedding_key(text)
+                vector = self.memory.get(key)
+                if vector is not None:
+                    self.memory.move_to_end(key)
+                    self.memory_hits += 1
+                elif self.disk is not None and (vector := self.disk.get(key)) is not None:
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+                results.append(vector)
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[List[float]]):
+        with self._lock:
+            items = [(embedding_key(text), list(vector)) for text, vector in zip(texts, vectors)]
+            for key, vector in items:
+                self._remember(key, vector)
+            if self.disk is not None:
+                try:
+                    self.disk.put_many(items)
+                except OSError as e:
+                    print(f"Embedding cache disk error: {e}")
+
+    def _remember(self, key: bytes, vector: List[float]):
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def stats(self) -> Dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "model": self.model,
+            "memory_entries": len(self.memory),
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+            "disk_dtype": self.disk.dtype_name if self.disk is not None else None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,262 @@
+"""
+issues_collection vektörleri üzerinde artımlı sorun kümeleme (online centroid ataması)
+
+- Yeni vektörler tüm centroid'lerle tek matris çarpımıyla karşılaştırılır (kosinüs);
+  en yakın küme CLUSTER_SIMILARITY_THRESHOLD üzerindeyse oraya atanır ve centroid
+  mini-batch k-means gibi 1/n öğrenme oranıyla güncellenir, değilse yeni küme açılır.
+- Küme boyutu, temsilci örnekler, günlük/saatlik sayaçlar ve büyüme oranı bellekte
+  tutulur; dashboard ve /api/admin/issue-clusters tam tarama yapmadan okur.
+- Açılışta mevcut collection bir kez yüklenir, sonrasında vector_index her başarılı
+  toplu yazımda yeni vektörleri buraya iletir.
+"""
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+import heapq
+import os
+import re
+import threading
+
+import numpy as np
+
+CLUSTER_SIMILARITY_THRESHOLD = float(os.getenv("CLUSTER_SIMILARITY_THRESHOLD", "0.80"))
+CLUSTER_MAX_CLUSTERS = int(os.getenv("CLUSTER_MAX_CLUSTERS", "256"))
+CLUSTER_EXAMPLES = 5
+CLUSTER_HISTORY_DAYS = 60
+CLUSTER_BOOTSTRAP_PAGE = 1000
+
+# Etiket üretiminde sayılmayan sık kelimeler
+STOPWORDS = {
+    "bir", "ve", "ile", "için", "ama", "fakat", "çok", "daha", "gibi", "olan", "oldu", "olarak",
+    "bu", "şu", "ben", "benim", "siz", "sizin", "bana", "beni", "hala", "hâlâ", "değil", "var",
+    "yok", "mi", "mı", "mu", "mü", "da", "de", "ki", "ne", "neden", "nasıl", "artık", "sonra",
+    "merhaba", "lütfen", "teşekkürler", "istiyorum", "ediyorum", "yapıyorum"
+}
+WORD_PATTERN = re.compile(r"[a-zçğıöşü]{4,}")
+
+
+def issue_time(metadata: Optional[dict]) -> Optional[datetime]:
+    """Vektör metadata'sından sorun zamanı (ts epoch, yoksa ISO timestamp/date alanları; hiçbiri yoksa None)"""
+    metadata = metadata or {}
+    if metadata.get("ts") is not None:
+        return datetime.fromtimestamp(float(metadata["ts"]))
+    for field in ("timestamp", "date"):
+        value = metadata.get(field)
+        if value:
+            try:
+                return datetime.fromisoformat(str(value))
+            except ValueError:
+                pass
+    return None
+
+
+class IssueCluster:
+    """Tek kümenin bellek içi özeti (centroid'ler IssueClusterer.centroids matrisinde)"""
+
+    __slots__ = ("cluster_id", "size", "examples", "daily", "hourly", "terms", "categories", "created_at")
+
+    def __init__(self, cluster_id: int):
+        self.cluster_id = cluster_id
+        self.size = 0
+        self.examples: List = []  # (benzerlik, sıra, metin) min-heap'i: centroid'e en yakın örnekler
+        self.daily: Counter = Counter()  # date -> adet
+        self.hourly: Counter = Counter()  # saat başlangıcı -> adet (büyüme oranı için)
+        self.terms: Counter = Counter()
+        self.categories: Counter = Counter()
+        self.created_at = datetime.now()
+
+    def label(self) -> str:
+        words = [word for word, _ in self.terms.most_common(3)]
+        if words:
+            return " / ".join(words)
+        category = self.categories.most_common(1)
+        return category[0][0] if category else f"küme {self.cluster_id}"
+
+    def growth_rate(self, now: datetime) -> float:
+        """Son 24 saat / önceki 24 saat (önceki boşsa son 24 saatteki adet)"""
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        recent = sum(self.hourly.get(hour - timedelta(hours=h), 0) for h in range(24))
+        previous = sum(self.hourly.get(hour - timedelta(hours=h), 0) for h in range(24, 48))
+        return round(recent / previous, 2) if previous else float(recent)
+
+    def summary(self, now: datetime, day: Optional[date] = None) -> Dict:
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        return {
+            "cluster_id": self.cluster_id,
+            "label": self.label(),
+            "size": self.size,
+            "count": self.daily.get(day, 0) if day is not None else self.size,
+            "last_24h": sum(self.hourly.get(hour - timedelta(hours=h), 0) for h in range(24)),
+            "growth_rate": self.growth_rate(now),
+            "top_category": self.categories.most_common(1)[0][0] if self.categories else None,
+            "examples": [text for _, _, text in sorted(self.examples, reverse=True)]
+        }
+
+
+class IssueClusterer:
+    """Bellek içi, thread-safe artımlı kümeleme"""
+
+    def __init__(self, threshold: float, max_clusters: int):
+        self.threshold = threshold
+        self.max_clusters = max_clusters
+        self.centroids: Optional[np.ndarray] = None  # (K, dim), birim uzunlukta
+        self.clusters: List[IssueCluster] = []
+        self.assignments: Dict[str, int] = {}  # issue_id -> küme
+        self.ready = False
+        self.error: Optional[str] = None  # Açılış yüklemesi başarısızsa dashboard kategori sayımına döner
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[Optional[str]],
+        metadatas: Sequence[Optional[dict]]
+    ) -> int:
+        """Yeni vektörleri kümelere ata (daha önce atanmış id'ler atlanır). Atanan adet döner."""
+        with self._lock:
+            rows = [i for i, issue_id in enumerate(ids) if issue_id not in self.assignments]
+            if not rows:
+                return 0
+            vectors = np.asarray([embeddings[i] for i in rows], dtype=np.float32)
+            if self.centroids is not None and vectors.shape[1] != self.centroids.shape[1]:
+                return 0  # Farklı model/boyut: bu kümelemeye ait değil
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.clip(norms, 1e-12, None)
+
+            # Mevcut centroid'lere toplu benzerlik (B x K)
+            known = 0 if self.centroids is None else self.centroids.shape[0]
+            if known:
+                similarities = vectors @ self.centroids.T
+                best = similarities.argmax(axis=1)
+                best_similarity = similarities[np.arange(len(rows)), best]
+            else:
+                best = np.full(len(rows), -1)
+                best_similarity = np.full(len(rows), -1.0)
+
+            for position, row in enumerate(rows):
+                vector = vectors[position]
+                cluster_index = int(best[position])
+                similarity = float(best_similarity[position])
+                if len(self.clusters) > known:
+                    # Bu batch içinde açılan kümeler matriste yok: sadece onlarla karşılaştır
+                    fresh = self.centroids[known:] @ vector
+                    fresh_best = int(fresh.argmax())
+                    if fresh[fresh_best] > similarity:
+                        cluster_index, similarity = known + fresh_best, float(fresh[fresh_best])
+                if cluster_index < 0 or (similarity < self.threshold and len(self.clusters) < self.max_clusters):
+                    cluster_index, similarity = self._open_cluster(vector), 1.0
+                self._assign(cluster_index, vector, similarity, ids[row], documents[row], metadatas[row])
+            return len(rows)
+
+    def _open_cluster(self, vector: np.ndarray) -> int:
+        cluster = IssueCluster(len(self.clusters))
+        self.clusters.append(cluster)
+        row = vector[None, :]
+        self.centroids = row.copy() if self.centroids is None else np.vstack([self.centroids, row])
+        return cluster.cluster_id
+
+    def _assign(
+        self,
+        cluster_index: int,
+        vector: np.ndarray,
+        similarity: float,
+        issue_id: str,
+        document: Optional[str],
+        metadata: Optional[dict]
+    ):
+        cluster = self.clusters[cluster_index]
+        cluster.size += 1
+        # Mini-batch k-means adımı: centroid += (x - centroid) / n, sonra birim uzunluğa normalize
+        centroid = self.centroids[cluster_index]
+        centroid += (vector - centroid) / cluster.size
+        centroid /= max(float(np.linalg.norm(centroid)), 1e-12)
+        self.assignments[issue_id] = cluster_index
+
+        timestamp = issue_time(metadata)
+        if timestamp is not None:
+            # Zamanı bilinmeyen vektör günlük/saatlik sayaçlara (büyüme oranına) yazılmaz
+            cluster.daily[timestamp.date()] += 1
+            cluster.hourly[timestamp.replace(minute=0, second=0, microsecond=0)] += 1
+        if metadata and metadata.get("category"):
+            cluster.categories[metadata["category"]] += 1
+        if document:
+            cluster.terms.update(
+                word for word in WORD_PATTERN.findall(document.lower()) if word not in STOPWORDS
+            )
+            self._seq += 1
+            entry = (similarity, self._seq, document)
+            if len(cluster.examples) < CLUSTER_EXAMPLES:
+                heapq.heappush(cluster.examples, entry)
+            elif similarity > cluster.examples[0][0]:
+                heapq.heapreplace(cluster.examples, entry)
+        self._prune(cluster, datetime.now())
+
+    @staticmethod
+    def _prune(cluster: IssueCluster, now: datetime):
+        if len(cluster.hourly) > 24 * 3:
+            cutoff = now - timedelta(hours=48)
+            for hour in [h for h in cluster.hourly if h < cutoff]:
+                del cluster.hourly[hour]
+        if len(cluster.daily) > CLUSTER_HISTORY_DAYS:
+            for day in sorted(cluster.daily)[:-CLUSTER_HISTORY_DAYS]:
+                del cluster.daily[day]
+        if len(cluster.terms) > 500:
+            cluster.terms = Counter(dict(cluster.terms.most_common(200)))
+
+    def top_clusters(self, limit: int = 5, day: Optional[date] = None, min_size: int = 1) -> List[Dict]:
+        """En büyük kümeler (day verilirse o günkü adede göre)"""
+        now = datetime.now()
+        with self._lock:
+            if day is not None:
+                candidates = [c for c in self.clusters if c.daily.get(day, 0) > 0]
+                ranked = heapq.nlargest(limit, candidates, key=lambda c: (c.daily[day], c.size))
+                return [c.summary(now, day) for c in ranked]
+            candidates = [c for c in self.clusters if c.size >= min_size]
+            return [c.summary(now) for c in heapq.nlargest(limit, candidates, key=lambda c: c.size)]
+
+    def emerging(self, limit: int = 5, min_recent: int = 3) -> List[Dict]:
+        """Son 24 saatte büyüme oranı en yüksek kümeler"""
+        now = datetime.now()
+        with self._lock:
+            summaries = [c.summary(now) for c in self.clusters]
+        summaries = [s for s in summaries if s["last_24h"] >= min_recent]
+        return heapq.nlargest(limit, summaries, key=lambda s: (s["growth_rate"], s["last_24h"]))
+
+    def stats(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "clusters": len(self.clusters),
+            "assigned": len(self.assignments),
+            "threshold": self.threshold,
+            "max_clusters": self.max_clusters
+        }
+
+    def bootstrap(self, collection) -> int:
+        """Mevcut collection'daki tüm vektörleri sayfa sayfa yükle (sadece başarılıysa ready olur)"""
+        total = 0
+        offset = 0
+        try:
+            while True:
+                page = collection.get(
+                    include=["embeddings", "documents", "metadatas"],
+                    limit=CLUSTER_BOOTSTRAP_PAGE,
+                    offset=offset
+                )
+                if not page["ids"]:
+                    break
+                total += self.add(page["ids"], page["embeddings"], page["documents"], page["metadatas"])
+                offset += len(page["ids"])
+        except Exception as e:
+            self.error = str(e)
+            print(f"Issue clustering bootstrap error: {e}")
+            return total
+        self.error = None
+        self.ready = True
+        print(f"✅ Issue clustering: {total} sorun, {len(self.clusters)} küme")
+        return total
+
+
+issue_clusterer = IssueClusterer(CLUSTER_SIMILARITY_THRESHOLD, CLUSTER_MAX_CLUSTERS)
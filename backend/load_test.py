@@ -0,0 +1,409 @@
+"""
+WebSocket yük testi: N eşleşmiş müşteri/temsilci oturumu ile tek backend örneğini ölçer
+
+Her oturum kendi odasında /ws/customer/{id} ve /ws/agent/{id} bağlantısı açar, seed.py'deki
+SAMPLE_CONVERSATIONS ve "örnek konuşmalar.txt" diyaloglarını sırayla oynatır; istenirse canlı
+analiz (live_mode) açar ve diyalog sonunda analyze gönderir. Ölçülenler:
+- fanout      : add_text gönderimi -> karşı tarafın new_message'ı alması
+- analysis    : analyze -> analysis_result (stream açıksa ilk analysis_partial ayrıca)
+- live        : son mesaj -> canlı analysis_result (debounce süresi dahil)
+- throughput  : saniyedeki gönderilen/alınan mesaj ve tamamlanan analiz
+- server      : /api/stats üzerinden periyodik bellek ve bağlantı örnekleri
+Sonuç JSON dosyasına yazılır (koşular karşılaştırılabilsin).
+
+Örnek:
+    python load_test.py --sessions 100 --ramp 10 --live-mode --output results/100.json
+"""
+from collections import Counter, defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+import argparse
+import ast
+import asyncio
+import json
+import random
+import re
+import time
+
+import httpx
+import websockets
+
+BASE_DIR = Path(__file__).resolve().parent
+DIALOGUES_FILE = BASE_DIR.parent / "örnek konuşmalar.txt"
+ROLE_PREFIXES = {"customer": "Müşteri", "agent": "Temsilci"}
+SPEAKER_PATTERN = re.compile(r"(Müşteri|Temsilci):")
+
+Dialogue = List[Tuple[str, str]]  # [(rol, metin), ...]
+
+
+def load_seed_dialogues() -> List[Dialogue]:
+    """seed.py'deki SAMPLE_CONVERSATIONS (import edilmeden: seed.py veritabanına bağlanır)"""
+    tree = ast.parse((BASE_DIR / "seed.py").read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "SAMPLE_CONVERSATIONS" for target in node.targets
+        ):
+            samples = ast.literal_eval(node.value)
+            return [[(msg["sender"], msg["content"]) for msg in sample["messages"]] for sample in samples]
+    return []
+
+
+def load_text_dialogues(path: Path) -> List[Dialogue]:
+    """"Müşteri: ... Temsilci: ..." biçimindeki dosyayı "Konuşma #n" başlıklarından böl"""
+    if not path.exists():
+        return []
+    dialogues = []
+    for block in re.split(r"Konuşma #\d+", path.read_text(encoding="utf-8")):
+        parts = SPEAKER_PATTERN.split(block)
+        turns = [
+            ("customer" if speaker == "Müşteri" else "agent", " ".join(text.split()))
+            for speaker, text in zip(parts[1::2], parts[2::2])
+            if text.strip()
+        ]
+        if turns:
+            dialogues.append(turns)
+    return dialogues
+
+
+def percentiles(values: List[float]) -> Dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))], 2)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "p50": rank(50),
+        "p95": rank(95),
+        "p99": rank(99),
+        "max": round(ordered[-1], 2)
+    }
+
+
+class Metrics:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.counters: Counter = Counter()
+        self.errors: Counter = Counter()
+
+    def observe(self, name: str, seconds: float):
+        self.latencies[name].append(seconds * 1000)
+
+
+class Peer:
+    """Tek WebSocket bağlantısı; gelen mesajları okuyan görev bekleyen future'ları çözer"""
+
+    def __init__(self, role: str, metrics: Metrics):
+        self.role = role
+        self.metrics = metrics
+        self.websocket = None
+        self.reader: Optional[asyncio.Task] = None
+        self.expected: Dict[str, Deque[Tuple[float, asyncio.Future]]] = defaultdict(deque)  # metin -> gönderimler
+        self.waiters: Dict[str, Deque[asyncio.Future]] = defaultdict(deque)  # mesaj tipi -> bekleyenler
+        self.on_message = None
+
+    async def connect(self, url: str):
+        self.websocket = await websockets.connect(url, max_size=None, open_timeout=30)
+        self.reader = asyncio.create_task(self._read())
+
+    async def send(self, payload: Dict):
+        await self.websocket.send(json.dumps(payload, ensure_ascii=False))
+        self.metrics.counters["sent"] += 1
+
+    def expect_message(self, text: str) -> asyncio.Future:
+        """Bu bağlantıya text içerikli new_message geldiğinde çözülecek future"""
+        future = asyncio.get_running_loop().create_future()
+        self.expected[text].append((time.perf_counter(), future))
+        return future
+
+    def wait_for(self, message_type: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[message_type].append(future)
+        return future
+
+    async def _read(self):
+        try:
+            async for raw in self.websocket:
+                received = time.perf_counter()
+                message = json.loads(raw)
+                message_type = message.get("type")
+                self.metrics.counters["received"] += 1
+                self.metrics.counters[f"received.{message_type}"] += 1
+
+                if message_type == "new_message" and self.expected.get(message.get("text")):
+                    sent, future = self.expected[message["text"]].popleft()
+                    self.metrics.observe("fanout", received - sent)
+                    if not future.done():
+                        future.set_result(received)
+                if message_type == "error":
+                    self.metrics.errors[f"server: {message.get('message', '')[:80]}"] += 1
+                if self.on_message is not None:
+                    self.on_message(message, received)
+                waiters = self.waiters.get(message_type)
+                while waiters:
+                    future = waiters.popleft()
+                    if not future.done():
+                        future.set_result((message, received))
+                        break
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for waiters in self.waiters.values():
+                for future in waiters:
+                    if not future.done():
+                        future.set_exception(ConnectionError(f"{self.role} bağlantısı kapandı"))
+
+    async def close(self):
+        if self.websocket is not None:
+            await self.websocket.close()
+        if self.reader is not None:
+            await asyncio.gather(self.reader, return_exceptions=True)
+
+
+class Session:
+    """Aynı odadaki müşteri + temsilci çifti"""
+
+    def __init__(self, index: int, run_id: str, args: argparse.Namespace, metrics: Metrics):
+        self.index = index
+        self.room = f"load-{run_id}-{index}"
+        self.client_id = f"{run_id}-{index}"
+        self.args = args
+        self.metrics = metrics
+        self.customer = Peer("customer", metrics)
+        self.agent = Peer("agent", metrics)
+        self.agent.on_message = self._on_agent_message
+        self.last_turn_sent = 0.0
+        self.first_partial: Optional[float] = None
+
+    def _on_agent_message(self, message: Dict, received: float):
+        if message.get("type") == "analysis_result" and message.get("live"):
+            self.metrics.observe("live_analysis", received - self.last_turn_sent)
+            self.metrics.counters["live_analyses"] += 1
+        elif message.get("type") == "analysis_partial" and self.first_partial is None:
+            self.first_partial = received
+
+    async def connect(self):
+        started = time.perf_counter()
+        query = f"?room={self.room}"
+        for peer, path in ((self.agent, "agent"), (self.customer, "customer")):
+            connected = peer.wait_for("connected")
+            await peer.connect(f"{self.args.url}/ws/{path}/{self.client_id}{query}")
+            await asyncio.wait_for(connected, self.args.timeout)
+        self.metrics.observe("connect", time.perf_counter() - started)
+
+        if self.args.live_mode:
+            changed = self.agent.wait_for("live_mode_changed")
+            await self.agent.send({"type": "live_mode", "enabled": True})
+            await asyncio.wait_for(changed, self.args.timeout)
+        if self.args.stream:
+            changed = self.agent.wait_for("stream_mode_changed")
+            await self.agent.send({"type": "stream_mode", "enabled": True})
+            await asyncio.wait_for(changed, self.args.timeout)
+
+    async def play(self, dialogue: Dialogue, rng: random.Random):
+        for role, content in dialogue:
+            sender, receiver = (self.customer, self.agent) if role == "customer" else (self.agent, self.customer)
+            text = f"{ROLE_PREFIXES[role]}: {content}"
+            delivered = receiver.expect_message(text)
+            self.last_turn_sent = time.perf_counter()
+            await sender.send({"type": "add_text", "text": text})
+            try:
+                await asyncio.wait_for(asyncio.shield(delivered), self.args.timeout)
+            except asyncio.TimeoutError:
+                self.metrics.errors["fanout timeout"] += 1
+            if self.args.typing_delay:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * self.args.typing_delay)
+
+        if self.args.analyze:
+            await self.analyze()
+
+        changed = self.agent.wait_for("cleared")
+        await self.agent.send({"type": "clear"})
+        await asyncio.wait_for(changed, self.args.timeout)
+
+    async def analyze(self):
+        self.first_partial = None
+        result = self.agent.wait_for("analysis_result")
+        error = self.agent.wait_for("error")
+        started = time.perf_counter()
+        await self.agent.send({"type": "analyze", "stream": self.args.stream})
+        try:
+            done, _ = await asyncio.wait({result, error}, timeout=self.args.analysis_timeout,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if result in done:
+                # Canlı analiz sonucu da aynı tipte gelir; manuel sonucu live alanından ayır
+                message, received = result.result()
+                while message.get("live"):
+                    result = self.agent.wait_for("analysis_result")
+                    message, received = await asyncio.wait_for(result, self.args.analysis_timeout)
+                self.metrics.observe("analysis", received - started)
+                if self.first_partial is not None:
+                    self.metrics.observe("analysis_first_partial", self.first_partial - started)
+                self.metrics.counters["analyses"] += 1
+            elif error in done:
+                self.metrics.counters["analysis_errors"] += 1
+            else:
+                self.metrics.errors["analysis timeout"] += 1
+        finally:
+            for future in (result, error):
+                if not future.done():
+                    future.cancel()
+
+    async def close(self):
+        await asyncio.gather(self.customer.close(), self.agent.close(), return_exceptions=True)
+
+
+class ServerSampler:
+    """/api/stats'tan periyodik bellek / bağlantı örnekleri"""
+
+    def __init__(self, http_url: str, interval: float):
+        self.http_url = http_url
+        self.interval = interval
+        self.samples: List[Dict] = []
+        self.started = time.perf_counter()
+
+    async def sample(self, client: httpx.AsyncClient):
+        try:
+            stats = (await client.get(f"{self.http_url}/api/stats")).json()
+        except Exception as e:
+            self.samples.append({"t": round(time.perf_counter() - self.started, 2), "error": str(e)})
+            return
+        self.samples.append({
+            "t": round(time.perf_counter() - self.started, 2),
+            "active_connections": stats.get("active_connections"),
+            "rss_mb": stats.get("process", {}).get("rss_mb"),
+            "peak_rss_mb": stats.get("process", {}).get("peak_rss_mb"),
+            "llm_in_flight": stats.get("llm", {}).get("in_flight")
+        })
+
+    async def run(self, stop: asyncio.Event):
+        async with httpx.AsyncClient(timeout=10, trust_env=False) as client:
+            while not stop.is_set():
+                await self.sample(client)
+                try:
+                    await asyncio.wait_for(stop.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.sample(client)
+
+    def summary(self) -> Dict:
+        rss = [s["rss_mb"] for s in self.samples if s.get("rss_mb") is not None]
+        connections = [s["active_connections"] for s in self.samples if s.get("active_connections") is not None]
+        return {
+            "rss_mb": {"start": rss[0], "peak": max(rss), "end": rss[-1]} if rss else None,
+            "peak_connections": max(connections) if connections else None,
+            "samples": self.samples
+        }
+
+
+async def run_session(
+    index: int,
+    run_id: str,
+    args: argparse.Namespace,
+    metrics: Metrics,
+    dialogues: List[Dialogue]
+):
+    rng = random.Random(f"{args.seed}-{index}")
+    await asyncio.sleep(args.ramp * index / max(1, args.sessions))
+    session = Session(index, run_id, args, metrics)
+    try:
+        await session.connect()
+        metrics.counters["sessions_connected"] += 1
+        for _ in range(args.conversations):
+            await session.play(rng.choice(dialogues), rng)
+        metrics.counters["sessions_completed"] += 1
+    except Exception as e:
+        metrics.errors[f"session: {type(e).__name__}: {str(e)[:80]}"] += 1
+    finally:
+        await session.close()
+
+
+async def run_load_test(args: argparse.Namespace) -> Dict:
+    dialogues = load_seed_dialogues() + load_text_dialogues(Path(args.dialogues_file))
+    if not dialogues:
+        raise SystemExit("Oynatılacak diyalog bulunamadı")
+    http_url = args.http_url or re.sub(r"^ws", "http", args.url)
+    run_id = datetime.now().strftime("%H%M%S")
+    metrics = Metrics()
+    sampler = ServerSampler(http_url, args.stats_interval)
+    stop = asyncio.Event()
+    sampler_task = asyncio.create_task(sampler.run(stop))
+
+    print(f"🚀 {args.sessions} oturum, {len(dialogues)} diyalog, hedef {args.url}")
+    started_at = datetime.now()
+    started = time.perf_counter()
+    await asyncio.gather(*[run_session(i, run_id, args, metrics, dialogues) for i in range(args.sessions)])
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler_task
+
+    return {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "started_at": started_at.isoformat(),
+        "duration_s": round(elapsed, 2),
+        "dialogues": len(dialogues),
+        "sessions": {
+            "requested": args.sessions,
+            "connected": metrics.counters["sessions_connected"],
+            "completed": metrics.counters["sessions_completed"]
+        },
+        "latency_ms": {name: percentiles(values) for name, values in sorted(metrics.latencies.items())},
+        "throughput": {
+            "messages_sent_per_s": round(metrics.counters["sent"] / elapsed, 2),
+            "messages_received_per_s": round(metrics.counters["received"] / elapsed, 2),
+            "analyses_per_s": round(metrics.counters["analyses"] / elapsed, 3)
+        },
+        "counters": dict(sorted(metrics.counters.items())),
+        "errors": dict(metrics.errors),
+        "server": sampler.summary()
+    }
+
+
+def print_summary(result: Dict):
+    print(f"✅ {result['sessions']['completed']}/{result['sessions']['requested']} oturum tamamlandı "
+          f"({result['duration_s']}s)")
+    for name, stats in result["latency_ms"].items():
+        if stats["count"]:
+            print(f"   {name:<24} n={stats['count']:<6} p50={stats['p50']}ms p95={stats['p95']}ms p99={stats['p99']}ms")
+    throughput = result["throughput"]
+    print(f"   mesaj/s gönderilen={throughput['messages_sent_per_s']} alınan={throughput['messages_received_per_s']} "
+          f"analiz/s={throughput['analyses_per_s']}")
+    if result["server"]["rss_mb"]:
+        print(f"   sunucu bellek (MB): {result['server']['rss_mb']}")
+    if result["errors"]:
+        print(f"⚠️ Hatalar: {result['errors']}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Eşzamanlı müşteri/temsilci WebSocket yük testi")
+    parser.add_argument("--url", default="ws://localhost:8000", help="Backend WebSocket adresi")
+    parser.add_argument("--http-url", default=None, help="/api/stats için HTTP adresi (varsayılan: --url'den)")
+    parser.add_argument("--sessions", type=int, default=10, help="Eşzamanlı müşteri/temsilci çifti")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Tüm oturumların açılacağı süre (s)")
+    parser.add_argument("--conversations", type=int, default=1, help="Oturum başına oynatılacak diyalog")
+    parser.add_argument("--typing-delay", type=float, default=0.5, help="Mesajlar arası ortalama bekleme (s)")
+    parser.add_argument("--analyze", action=argparse.BooleanOptionalAction, default=True,
+                        help="Diyalog sonunda analyze gönder")
+    parser.add_argument("--live-mode", action="store_true", help="Temsilci tarafında canlı analizi aç")
+    parser.add_argument("--stream", action="store_true", help="Akışlı analiz (analysis_partial)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Mesaj iletimi zaman aşımı (s)")
+    parser.add_argument("--analysis-timeout", type=float, default=120.0, help="Analiz zaman aşımı (s)")
+    parser.add_argument("--stats-interval", type=float, default=1.0, help="Sunucu örnekleme aralığı (s)")
+    parser.add_argument("--dialogues-file", default=str(DIALOGUES_FILE), help="Ek diyalog dosyası")
+    parser.add_argument("--seed", type=int, default=1, help="Diyalog seçimi ve beklemeler için seed")
+    parser.add_argument("--output", default=None, help="Sonuç JSON dosyası (varsayılan: load_test_<zaman>.json)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = asyncio.run(run_load_test(args))
+    output = Path(args.output or f"load_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print_summary(result)
+    print(f"📄 Sonuçlar: {output}")
@@ -0,0 +1,163 @@
+"""
+Yerel CPU embedding backend'i (EMBEDDING_BACKEND=local)
+
+Küçük çok dilli bir sentence-transformers modeli, ayrı worker process'lerde (GIL ve
+event loop'tan bağımsız) yüklenir ve gelen parçalar toplu (batch) olarak encode edilir.
+LOCAL_EMBEDDING_QUANTIZE:
+- none : model olduğu gibi (float32)
+- int8 : Linear katmanlarına torch dinamik int8 kuantizasyonu
+- onnx : optimum + onnxruntime ile ONNX'e çevrilmiş model (optimum kurulu olmalı)
+
+Bu modül worker process'lerde de import edildiği için üst seviyede ağır import yapmaz.
+
+Worker'lar spawn ile açılır ve ana process'in __main__ modülünü yeniden import eder:
+- Havuz import anında değil, ilk embed() çağrısında kurulur; worker içinde havuz kurulmaz.
+- Sunucu "uvicorn main:app" ile başlatılmalı; "python main.py" ile başlatılırsa main modülü
+  her worker'da __main__ olarak yeniden import edilir ve uygulama başlangıcı tekrar çalışır.
+- Bu backend'i kullanan betikler (vector_index.py, seed.py) işlerini
+  if __name__ == "__main__" bloğunda yapmalı.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+import multiprocessing
+import os
+import threading
+
+LOCAL_EMBEDDING_MODEL = os.getenv(
+    "LOCAL_EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+)
+LOCAL_EMBEDDING_WORKERS = int(os.getenv("LOCAL_EMBEDDING_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+LOCAL_EMBEDDING_THREADS = int(os.getenv("LOCAL_EMBEDDING_THREADS", "1"))  # Worker başına torch thread'i
+LOCAL_EMBEDDING_BATCH_SIZE = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "32"))
+LOCAL_EMBEDDING_QUANTIZE = os.getenv("LOCAL_EMBEDDING_QUANTIZE", "none").lower()
+QUANTIZE_MODES = ("none", "int8", "onnx")
+
+# Worker process içindeki model (initializer ile bir kez yüklenir)
+_encoder = None
+
+
+class _OnnxEncoder:
+    """optimum ORT modeli + mean pooling (sentence-transformers encode() ile aynı çıktı biçimi)"""
+
+    def __init__(self, model_name: str, threads: int):
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True, session_options=options)
+
+    def encode(self, texts: List[str], batch_size: int) -> List[List[float]]:
+        import numpy as np
+
+        vectors = []
+        for start in range(0, len(texts), batch_size):
+            batch = self.tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True, return_tensors="np"
+            )
+            hidden = self.model(**batch).last_hidden_state
+            mask = batch["attention_mask"][..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            vectors.extend(pooled.tolist())
+        return vectors
+
+
+class _SentenceTransformerEncoder:
+    def __init__(self, model_name: str, threads: int, quantize: str):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        torch.set_num_threads(threads)
+        self.model = SentenceTransformer(model_name, device="cpu")
+        if quantize == "int8":
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def encode(self, texts: List[str], batch_size: int) -> List[List[float]]:
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ).tolist()
+
+
+def _init_worker(model_name: str, threads: int, quantize: str):
+    global _encoder
+    if quantize == "onnx":
+        _encoder = _OnnxEncoder(model_name, threads)
+    else:
+        _encoder = _SentenceTransformerEncoder(model_name, threads, quantize)
+
+
+def _encode(texts: List[str], batch_size: int) -> List[List[float]]:
+    return _encoder.encode(texts, batch_size)
+
+
+class LocalEmbeddingBackend:
+    """Worker process havuzu; embed() çağıran thread'i sonuç gelene kadar bekletir"""
+
+    def __init__(
+        self,
+        model_name: str = LOCAL_EMBEDDING_MODEL,
+        workers: int = LOCAL_EMBEDDING_WORKERS,
+        threads: int = LOCAL_EMBEDDING_THREADS,
+        batch_size: int = LOCAL_EMBEDDING_BATCH_SIZE,
+        quantize: str = LOCAL_EMBEDDING_QUANTIZE
+    ):
+        if quantize not in QUANTIZE_MODES:
+            raise ValueError(f"LOCAL_EMBEDDING_QUANTIZE geçersiz: {quantize} ({', '.join(QUANTIZE_MODES)})")
+        self.model_name = model_name
+        self.workers = workers
+        self.batch_size = batch_size
+        self.quantize = quantize
+        self.threads = threads
+        self.cache_key = model_name if quantize == "none" else f"{model_name}+{quantize}"
+        self._lock = threading.Lock()
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.closed = False
+        print(f"✅ Local embedding backend: {model_name} ({workers} worker, quantize={quantize}, ilk istekte başlar)")
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Havuzu ilk kullanımda kur (modül import'u process açmaz)"""
+        with self._lock:
+            if self.closed:
+                raise RuntimeError("Local embedding backend kapatıldı")
+            if self.pool is None:
+                self.pool = self._create_pool()
+            return self.pool
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        if multiprocessing.parent_process() is not None:
+            # Worker, __main__'i yeniden import ederken buraya ulaştıysa zincirleme havuz açılmasın
+            raise RuntimeError("Local embedding havuzu worker process içinde kurulamaz")
+        # fork yerine spawn: sunucu thread'leri ve torch thread havuzu child'a kopyalanmaz
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.threads, self.quantize)
+        )
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        pool = self._get_pool()
+        try:
+            return pool.submit(_encode, list(texts), self.batch_size).result()
+        except BrokenProcessPool:
+            # Çöken worker'lar (bellek yetersizliği vb.) için havuzu yenile; çağıran yeniden dener
+            with self._lock:
+                if self.pool is pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self.pool = None
+            raise
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
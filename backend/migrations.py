@@ -0,0 +1,164 @@
+"""
+Basit şema migration mekanizması + admin sorguları için EXPLAIN QUERY PLAN kontrolü
+
+Yeni bir migration eklemek için MIGRATIONS listesine sıradaki versiyonla
+(versiyon, açıklama, [SQL ifadeleri veya conn alan fonksiyonlar]) ekleyin.
+Uygulanan versiyonlar schema_migrations tablosunda tutulur.
+"""
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple, Union
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+Step = Union[str, Callable[[Connection], None]]
+
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (1, "conversation index plan", [
+        "CREATE INDEX IF NOT EXISTS ix_conversations_timestamp ON conversations (timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_conversations_category_timestamp ON conversations (category, timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_conversations_is_resolved_timestamp ON conversations (is_resolved, timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_conversations_customer_emotion_timestamp ON conversations (customer_emotion, timestamp)",
+    ]),
+    (2, "rollup lookup index", [
+        "CREATE INDEX IF NOT EXISTS ix_rollups_lookup ON conversation_rollups (granularity, dimension, bucket_start)",
+    ]),
+    (3, "refresh planner statistics", [
+        "ANALYZE",
+    ]),
+]
+
+
+def applied_versions(conn: Connection) -> set:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, description TEXT NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Uygulanmamış migration'ları sırayla, her birini kendi transaction'ında çalıştır"""
+    applied = []
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+
+    for version, description, steps in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(text(step))
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": version, "d": description, "t": datetime.now()}
+            )
+        applied.append(version)
+        print(f"✅ Migration {version} uygulandı: {description}")
+    return applied
+
+
+def admin_query_shapes() -> Dict[str, object]:
+    """Admin endpoint'lerinin kullandığı sorgu şekilleri (plan kontrolü için)"""
+    from sqlalchemy import and_, func, or_, select
+    from database import Conversation, ConversationRollup
+
+    now = datetime.now()
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_end = day_start + timedelta(days=1)
+    week_ago = now - timedelta(days=7)
+    in_day = (Conversation.timestamp >= day_start, Conversation.timestamp <= day_end)
+    # list_conversations keyset filtresi (cursor: timestamp=now, id=1000)
+    cursor = (
+        Conversation.timestamp <= now,
+        or_(Conversation.timestamp < now, and_(Conversation.timestamp == now, Conversation.id < 1000))
+    )
+
+    return {
+        "dashboard.top_categories": select(Conversation.category, func.count(Conversation.id)).where(
+            *in_day, Conversation.category.isnot(None)
+        ).group_by(Conversation.category),
+        "dashboard.recent": select(Conversation).where(*in_day).order_by(Conversation.id.desc()).limit(10),
+        "dashboard.rollups": select(ConversationRollup).where(
+            ConversationRollup.granularity == "hour",
+            ConversationRollup.dimension == "all",
+            ConversationRollup.bucket_start >= day_start,
+            ConversationRollup.bucket_start < day_end
+        ),
+        "trends": select(func.date(Conversation.timestamp), func.count(Conversation.id)).where(
+            Conversation.timestamp >= week_ago
+        ).group_by(func.date(Conversation.timestamp)),
+        "trends.category": select(func.date(Conversation.timestamp), func.count(Conversation.id)).where(
+            Conversation.timestamp >= week_ago, Conversation.category == "billing_error"
+        ).group_by(func.date(Conversation.timestamp)),
+        "trends.emotion": select(func.date(Conversation.timestamp), func.count(Conversation.id)).where(
+            Conversation.timestamp >= week_ago, Conversation.customer_emotion == "angry"
+        ).group_by(func.date(Conversation.timestamp)),
+        "conversations": select(Conversation).order_by(
+            Conversation.timestamp.desc(), Conversation.id.desc()
+        ).limit(51),
+        "conversations.cursor": select(Conversation).where(*cursor).order_by(
+            Conversation.timestamp.desc(), Conversation.id.desc()
+        ).limit(51),
+        "conversations.cursor.category": select(Conversation).where(
+            Conversation.category == "billing_error", *cursor
+        ).order_by(Conversation.timestamp.desc(), Conversation.id.desc()).limit(51),
+        "conversations.resolved": select(Conversation).where(
+            Conversation.is_resolved == True
+        ).order_by(Conversation.timestamp.desc(), Conversation.id.desc()).limit(51),
+        "conversations.category": select(Conversation).where(
+            Conversation.category == "billing_error"
+        ).order_by(Conversation.timestamp.desc(), Conversation.id.desc()).limit(51),
+        "conversations.count": select(func.sum(ConversationRollup.total)).where(
+            ConversationRollup.granularity == "day",
+            ConversationRollup.dimension == "category",
+            ConversationRollup.dimension_value == "billing_error"
+        ),
+        "database_stats.first": select(Conversation).order_by(Conversation.timestamp.asc()).limit(1),
+    }
+
+
+def check_query_plans(engine: Engine) -> List[Dict]:
+    """
+    Her admin sorgusu için EXPLAIN QUERY PLAN çalıştır ve uses_index=False olanları işaretle:
+    - WHERE içeren sorgularda her SCAN adımı hatadır ("SCAN ... USING INDEX" dahil); filtre
+      indekste aralık/eşitlik araması ("SEARCH ...") olarak kullanılmalı.
+    - Filtresiz (sadece ORDER BY + LIMIT) sorgularda indeks sırasıyla tarama kabul edilir,
+      indekssiz tablo taraması ("SCAN <tablo>") hatadır.
+    """
+    results = []
+    with engine.connect() as conn:
+        for name, statement in admin_query_shapes().items():
+            compiled = statement.compile(dialect=engine.dialect)
+            params = tuple(compiled.params[key] for key in compiled.positiontup)
+            plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)]
+            filtered = getattr(statement, "whereclause", None) is not None
+            full_scans = [
+                step for step in plan
+                if step.startswith("SCAN ") and "SUBQUERY" not in step and (filtered or "USING" not in step)
+            ]
+            results.append({
+                "query": name,
+                "uses_index": not full_scans,
+                "plan": plan
+            })
+    return results
+
+
+if __name__ == "__main__":
+    from database import engine
+
+    if "--explain" in sys.argv:
+        failed = 0
+        for result in check_query_plans(engine):
+            status = "✅" if result["uses_index"] else "❌"
+            failed += not result["uses_index"]
+            print(f"{status} {result['query']}: {' | '.join(result['plan'])}")
+        sys.exit(1 if failed else 0)
+    else:
+        applied = run_migrations(engine)
+        print(f"✅ {len(applied)} migration uygulandı" if applied else "✅ Şema güncel")
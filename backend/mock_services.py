@@ -0,0 +1,333 @@
+"""
+Kurum ağı dışında test/benchmark için yerel taklit servis (LLM, embedding ve Tibco)
+
+- POST /v1/chat/completions : OpenAI chat-completions (stream=true ile SSE akışı); analiz JSON'u
+  konuşma metninin hash'inden deterministik üretilir
+- POST /v1/embeddings       : OpenAI embeddings; kelime hash'lerinden deterministik, normalize
+  vektörler (ortak kelimeli metinler birbirine yakın düşer)
+- POST /ServiceCatalog/Rest/SiebelServices/ManageServiceRequest/v1/ : Tibco SR yanıtı
+- GET  /mock/stats, GET/PUT /mock/config : sayaçlar ve çalışma anında profil değişikliği
+
+Gecikme profilleri: "fixed:50", "uniform:20,80", "normal:100,20", "lognormal:800,0.5"
+(lognormal: medyan ms, sigma). Hata oranı 0-1 arası; hatalar MOCK_ERROR_STATUS ile döner.
+Aynı MOCK_SEED ile gecikme/hata dizisi de tekrarlanabilir.
+
+Kullanım:
+    python mock_services.py --port 8001 --chat-latency lognormal:800,0.4 --chat-error-rate 0.02
+    .env: GPT_OSS_API_URL=http://localhost:8001/v1  TIBCO_URL=http://localhost:8001/ServiceCatalog/...
+          USE_PROXY=false
+"""
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+MOCK_SEED = int(os.getenv("MOCK_SEED", "1"))
+MOCK_EMBEDDING_DIM = int(os.getenv("MOCK_EMBEDDING_DIM", "768"))
+MOCK_ERROR_STATUS = int(os.getenv("MOCK_ERROR_STATUS", "503"))
+MOCK_STREAM_CHUNK_CHARS = int(os.getenv("MOCK_STREAM_CHUNK_CHARS", "12"))
+TIBCO_PATH = "/ServiceCatalog/Rest/SiebelServices/ManageServiceRequest/v1/"
+
+INSIGHTS = [
+    {"type": "success", "text": "Temsilci müşteriyi dinleyip net bir çözüm sundu"},
+    {"type": "success", "text": "Müşteriye süreç hakkında zamanında bilgi verildi"},
+    {"type": "warning", "text": "Müşteri sorunun tekrarlamasından rahatsız"},
+    {"type": "warning", "text": "Çözüm için net bir zaman verilmedi"},
+    {"type": "info", "text": "Müşteri alternatif paket/kampanya önerisine açık"},
+    {"type": "info", "text": "Benzer şikayetler bölgesel bir arızaya işaret edebilir"}
+]
+NEGATIVE_WORDS = ("yok", "sorun", "rezalet", "kötü", "şikayet", "iptal", "kabul edilemez", "hala", "!")
+
+
+class LatencyProfile:
+    """"tip:parametreler" biçimindeki gecikme dağılımı (ms)"""
+
+    def __init__(self, spec: str):
+        self.spec = (spec or "fixed:0").strip()
+        kind, _, raw = self.spec.partition(":")
+        self.kind = kind.lower()
+        self.params = [float(p) for p in raw.split(",") if p.strip()] if raw else []
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Bilinmeyen gecikme profili: {self.spec}")
+        needed = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}[self.kind]
+        if len(self.params) != needed:
+            raise ValueError(f"{self.kind} profili {needed} parametre bekler: {self.spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        """Saniye cinsinden gecikme"""
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            ms = rng.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            ms = rng.lognormvariate(math.log(max(median, 1e-3)), sigma)
+        return max(0.0, ms) / 1000
+
+
+class EndpointProfile:
+    def __init__(self, latency: str, error_rate: float, per_item_ms: float = 0.0):
+        self.latency = LatencyProfile(latency)
+        self.error_rate = error_rate
+        self.per_item_ms = per_item_ms  # embeddings: girdi başına ek gecikme
+        self.requests = 0
+        self.errors = 0
+        self.latency_total = 0.0
+
+    def describe(self) -> Dict:
+        return {
+            "latency": self.latency.spec,
+            "error_rate": self.error_rate,
+            "per_item_ms": self.per_item_ms,
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.latency_total / self.requests * 1000, 2) if self.requests else 0.0
+        }
+
+
+class MockState:
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.profiles = {
+            "chat": EndpointProfile(
+                os.getenv("MOCK_CHAT_LATENCY", "lognormal:800,0.35"),
+                float(os.getenv("MOCK_CHAT_ERROR_RATE", "0"))
+            ),
+            "stream_chunk": EndpointProfile(os.getenv("MOCK_STREAM_CHUNK_LATENCY", "fixed:15"), 0.0),
+            "embeddings": EndpointProfile(
+                os.getenv("MOCK_EMBEDDINGS_LATENCY", "lognormal:60,0.3"),
+                float(os.getenv("MOCK_EMBEDDINGS_ERROR_RATE", "0")),
+                float(os.getenv("MOCK_EMBEDDINGS_PER_ITEM_MS", "2"))
+            ),
+            "tibco": EndpointProfile(
+                os.getenv("MOCK_TIBCO_LATENCY", "lognormal:300,0.5"),
+                float(os.getenv("MOCK_TIBCO_ERROR_RATE", "0"))
+            )
+        }
+
+    async def delay(self, name: str, items: int = 0) -> float:
+        """Profildeki gecikmeyi uygula; hata enjekte edilecekse HTTPException fırlat"""
+        profile = self.profiles[name]
+        seconds = profile.latency.sample(self.rng) + profile.per_item_ms * items / 1000
+        fail = self.rng.random() < profile.error_rate
+        profile.requests += 1
+        profile.latency_total += seconds
+        await asyncio.sleep(seconds)
+        if fail:
+            profile.errors += 1
+            raise HTTPException(
+                status_code=MOCK_ERROR_STATUS,
+                detail={"error": {"message": f"mock {name} error", "type": "server_error", "code": MOCK_ERROR_STATUS}}
+            )
+        return seconds
+
+
+state = MockState(MOCK_SEED)
+app = FastAPI(title="Call Center Mock Services")
+
+
+def text_seed(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+def mock_analysis(conversation: str) -> Dict:
+    """Konuşma metninden deterministik analiz (olumsuz kelimeler skorları düşürür)"""
+    rng = random.Random(text_seed(conversation))
+    lowered = conversation.lower()
+    negativity = min(4, sum(lowered.count(word) for word in NEGATIVE_WORDS) // 2)
+    sentiment = max(1, min(10, rng.randint(6, 9) - negativity))
+    resolution = max(1, min(10, rng.randint(5, 10) - negativity // 2))
+    performance = rng.randint(6, 10)
+    resolved = resolution >= 6
+    return {
+        "sentiment": sentiment,
+        "resolution": resolution,
+        "agentPerformance": performance,
+        "insights": rng.sample(INSIGHTS, rng.randint(2, 4)),
+        "metrics": {
+            "responseTime": rng.choice(["Hızlı", "Orta", "Yavaş"]),
+            "empathyLevel": "Yüksek" if performance >= 8 else "Orta" if performance >= 6 else "Düşük",
+            "problemResolved": resolved,
+            "customerEmotion": "Pozitif" if sentiment >= 7 else "Nötr" if sentiment >= 5 else "Negatif"
+        }
+    }
+
+
+def mock_embedding(text: str, dim: int = MOCK_EMBEDDING_DIM) -> List[float]:
+    """Kelime başına sabit rastgele vektörlerin toplamı (bag-of-words), birim uzunlukta"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in re.findall(r"\w+", text.lower()) or [text]:
+        vector += np.random.RandomState(text_seed(word) % (2 ** 32)).standard_normal(dim).astype(np.float32)
+    norm = float(np.linalg.norm(vector))
+    return (vector / norm if norm else vector).tolist()
+
+
+def completion_content(messages: List[Dict]) -> str:
+    user_text = "\n".join(m.get("content") or "" for m in messages if m.get("role") == "user")
+    # Gerçek model gibi kod bloğu içinde JSON (parse_analysis_output bunu temizler)
+    return "```json\n" + json.dumps(mock_analysis(user_text), ensure_ascii=False) + "\n```"
+
+
+def usage(prompt: str, completion: str) -> Dict:
+    prompt_tokens, completion_tokens = max(1, len(prompt) // 4), max(1, len(completion) // 4)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+
+@app.exception_handler(HTTPException)
+async def openai_style_error(request: Request, exc: HTTPException):
+    return JSONResponse(status_code=exc.status_code, content=exc.detail)
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages") or []
+    model = body.get("model", "mock")
+    content = completion_content(messages)
+    completion_id = f"chatcmpl-{text_seed(content) % 10 ** 12}"
+    created = int(time.time())
+    prompt = "".join(m.get("content") or "" for m in messages)
+
+    if not body.get("stream"):
+        await state.delay("chat")
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": usage(prompt, content)
+        }
+
+    # Akış: chat gecikmesi ilk parçaya kadar, sonra parça başına stream_chunk gecikmesi
+    await state.delay("chat")
+
+    def chunk(delta: Dict, finish_reason: Optional[str] = None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+        return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    async def events():
+        yield chunk({"role": "assistant", "content": ""})
+        for start in range(0, len(content), MOCK_STREAM_CHUNK_CHARS):
+            await asyncio.sleep(state.profiles["stream_chunk"].latency.sample(state.rng))
+            yield chunk({"content": content[start:start + MOCK_STREAM_CHUNK_CHARS]})
+        yield chunk({}, "stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    inputs = body.get("input")
+    inputs = inputs if isinstance(inputs, list) else [inputs]
+    await state.delay("embeddings", items=len(inputs))
+    dim = int(body.get("dimensions") or MOCK_EMBEDDING_DIM)
+    return {
+        "object": "list",
+        "data": [
+            {"object": "embedding", "index": index, "embedding": mock_embedding(str(text), dim)}
+            for index, text in enumerate(inputs)
+        ],
+        "model": body.get("model", "mock-embedding"),
+        "usage": {"prompt_tokens": sum(len(str(t)) // 4 for t in inputs), "total_tokens": sum(len(str(t)) // 4 for t in inputs)}
+    }
+
+
+@app.post(TIBCO_PATH)
+async def manage_service_request(request: Request):
+    body = await request.json()
+    await state.delay("tibco")
+    if not body.get("MSISDN") or not body.get("SRStructure"):
+        return JSONResponse(status_code=400, content={
+            "ManageServiceRequestResponse_v1": {
+                "Header": {"ResultCode": "ERR", "ResultDescription": "MSISDN ve SRStructure zorunlu"}
+            }
+        })
+    sr_number = f"1-{text_seed(json.dumps(body, sort_keys=True, ensure_ascii=False)) % 10 ** 9:09d}"
+    return {
+        "ManageServiceRequestResponse_v1": {
+            "Header": {"ResultCode": "OK", "ResultDescription": "Success"},
+            "Body": {"Response": {"SRNumber": sr_number, "Status": "Open"}}
+        }
+    }
+
+
+@app.get("/mock/stats")
+async def mock_stats():
+    return {name: profile.describe() for name, profile in state.profiles.items()}
+
+
+@app.get("/mock/config")
+async def get_mock_config():
+    return await mock_stats()
+
+
+@app.put("/mock/config")
+async def update_mock_config(config: Dict[str, Dict]):
+    """Örn. {"chat": {"latency": "fixed:2000", "error_rate": 0.1}} (benchmark sırasında senaryo değiştirme)"""
+    for name, changes in config.items():
+        profile = state.profiles.get(name)
+        if profile is None:
+            raise HTTPException(status_code=400, detail={"error": {"message": f"Bilinmeyen profil: {name}"}})
+        try:
+            if "latency" in changes:
+                profile.latency = LatencyProfile(changes["latency"])
+            if "error_rate" in changes:
+                profile.error_rate = float(changes["error_rate"])
+            if "per_item_ms" in changes:
+                profile.per_item_ms = float(changes["per_item_ms"])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail={"error": {"message": str(e)}})
+    return await mock_stats()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="LLM / embedding / Tibco taklit servisi")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--seed", type=int, default=None, help="Gecikme/hata dizisi seed'i (MOCK_SEED)")
+    for name in ("chat", "embeddings", "tibco"):
+        parser.add_argument(f"--{name}-latency", default=None, help=f"{name} gecikme profili")
+        parser.add_argument(f"--{name}-error-rate", type=float, default=None, help=f"{name} hata oranı (0-1)")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        state.rng.seed(args.seed)
+    for name in ("chat", "embeddings", "tibco"):
+        latency = getattr(args, f"{name}_latency")
+        error_rate = getattr(args, f"{name}_error_rate")
+        if latency:
+            state.profiles[name].latency = LatencyProfile(latency)
+        if error_rate is not None:
+            state.profiles[name].error_rate = error_rate
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
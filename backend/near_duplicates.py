@@ -0,0 +1,246 @@
+"""
+MinHash + LSH ile yakın-kopya sorun tespiti (kesinti anlarındaki yüzlerce "internetim yok" için)
+
+- Metin Türkçe'ye uygun normalize edilir (I/İ, aksan katlama, tekrar eden harfler, sayılar),
+  karakter k-gram'larından NumPy ile tek seferde MinHash imzası çıkarılır.
+- İmza NEAR_DUP_BANDS banda bölünür; herhangi bir bandı aynı olan kayıtlar aday olur ve
+  tahmini Jaccard NEAR_DUP_THRESHOLD üzerindeyse kanonik kaydın kopyası sayılır.
+- Kanonik kayıtlar son görülmelerinden NEAR_DUP_TTL saniye sonra bellekten atılır.
+- source (oda / konuşma id'si) verilirse aynı kaynağın kayıtlarıyla eşleşilmez ve kaynak başına
+  sadece en son kayıt tutulur: büyüyen canlı transcript kendi eski halinin kopyası sayılmaz.
+- Kopyalar kanonik kaydın analizini ve embedding'ini (varsa) yeniden kullanabilir.
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+NEAR_DUP_ENABLED = os.getenv("NEAR_DUP_ENABLED", "true").lower() == "true"
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))
+NEAR_DUP_NUM_PERM = int(os.getenv("NEAR_DUP_NUM_PERM", "128"))
+NEAR_DUP_BANDS = int(os.getenv("NEAR_DUP_BANDS", "16"))
+NEAR_DUP_SHINGLE = int(os.getenv("NEAR_DUP_SHINGLE", "4"))
+NEAR_DUP_MIN_CHARS = int(os.getenv("NEAR_DUP_MIN_CHARS", "12"))
+NEAR_DUP_TTL = float(os.getenv("NEAR_DUP_TTL", "1800"))
+NEAR_DUP_MAX_ENTRIES = int(os.getenv("NEAR_DUP_MAX_ENTRIES", "50000"))
+# Kopya konuşmalarda model analizi yeniden kullanılsın mı (temsilci cevapları farklı olabilir)
+NEAR_DUP_REUSE_ANALYSIS = os.getenv("NEAR_DUP_REUSE_ANALYSIS", "false").lower() == "true"
+NEAR_DUP_REUSE_EMBEDDING = os.getenv("NEAR_DUP_REUSE_EMBEDDING", "true").lower() == "true"
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+TURKISH_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+
+
+def normalize_issue_text(text: str) -> str:
+    """Küçük harf (Türkçe I/İ), aksan katlama, noktalama/sayı ve uzatılmış harf farklarını yok say"""
+    text = text.replace("I", "ı").replace("İ", "i").lower().translate(TURKISH_FOLD)
+    text = re.sub(r"\d+", "0", text)
+    text = re.sub(r"[^a-z0\s]", " ", text)
+    text = re.sub(r"(.)\1{2,}", r"\1", text)  # "yoookkk" -> "yok"
+    return " ".join(text.split())
+
+
+class DuplicateGroup:
+    """Kanonik kayıt ve ona bağlanan kopyaların özeti"""
+
+    __slots__ = (
+        "key", "signature", "text", "source", "first_seen", "last_seen", "duplicates", "analysis", "embedding"
+    )
+
+    def __init__(self, key: str, signature: np.ndarray, text: str, source: Optional[str] = None):
+        self.key = key
+        self.signature = signature
+        self.text = text[:200]
+        self.source = source
+        self.first_seen = time.time()
+        self.last_seen = self.first_seen
+        self.duplicates = 0
+        self.analysis: Optional[Dict] = None
+        self.embedding: Optional[List[float]] = None
+
+
+class NearDuplicateIndex:
+    """Bellek içi MinHash/LSH indeksi (thread-safe)"""
+
+    def __init__(
+        self,
+        threshold: float = NEAR_DUP_THRESHOLD,
+        num_perm: int = NEAR_DUP_NUM_PERM,
+        bands: int = NEAR_DUP_BANDS,
+        shingle: int = NEAR_DUP_SHINGLE,
+        ttl_seconds: float = NEAR_DUP_TTL,
+        max_entries: int = NEAR_DUP_MAX_ENTRIES,
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError(f"NEAR_DUP_NUM_PERM ({num_perm}) NEAR_DUP_BANDS ({bands}) ile tam bölünmeli")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle = shingle
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Sabit seed: imzalar süreçler arası karşılaştırılabilir kalsın
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._groups: "OrderedDict[str, DuplicateGroup]" = OrderedDict()  # last_seen sırasına göre
+        self._tables: List[Dict[bytes, set]] = [{} for _ in range(bands)]
+        self._latest_by_source: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.evicted = 0
+        self.analysis_reuses = 0
+        self.embedding_reuses = 0
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Normalize metnin MinHash imzası (çok kısa metinlerde None)"""
+        normalized = normalize_issue_text(text)
+        if len(normalized) < max(NEAR_DUP_MIN_CHARS, self.shingle):
+            return None
+        padded = f" {normalized} "
+        shingles = {padded[i:i + self.shingle] for i in range(len(padded) - self.shingle + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        # (shingle x permütasyon) matrisinde (a*h + b) mod p, sütun minimumu = imza
+        permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def match(self, text: str, key: str, source: Optional[str] = None) -> Optional[DuplicateGroup]:
+        """
+        Metin bir kanonik kaydın yakın kopyasıysa o grubu döndür (kopya sayısı artar);
+        değilse metni key ile yeni kanonik kayıt olarak ekle ve None döndür.
+        Aynı source'a ait kayıtlar aday sayılmaz; source'un önceki kaydı yenisiyle değiştirilir.
+        """
+        signature = self.signature(text)
+        with self._lock:
+            self.checks += 1
+            if signature is None:
+                self.skipped += 1
+                return None
+            now = time.time()
+            self._evict(now)
+            band_keys = self._band_keys(signature)
+
+            best, best_similarity = None, self.threshold
+            candidates = set()
+            for table, band_key in zip(self._tables, band_keys):
+                candidates.update(table.get(band_key, ()))
+            for candidate in candidates:
+                group = self._groups[candidate]
+                if source is not None and group.source == source:
+                    continue
+                similarity = float(np.count_nonzero(group.signature == signature)) / self.num_perm
+                if similarity >= best_similarity:
+                    best, best_similarity = group, similarity
+
+            if best is not None:
+                best.duplicates += 1
+                best.last_seen = now
+                self._groups.move_to_end(best.key)
+                self.duplicates += 1
+                return best
+
+            if key in self._groups:
+                return None
+            if source is not None:
+                previous = self._latest_by_source.get(source)
+                if previous is not None and previous in self._groups:
+                    self._remove(previous)
+                self._latest_by_source[source] = key
+            self._groups[key] = DuplicateGroup(key, signature, text, source)
+            for table, band_key in zip(self._tables, band_keys):
+                table.setdefault(band_key, set()).add(key)
+            self._evict(now)  # max_entries yeni kayıtla aşıldıysa en eskisi çıkar
+            return None
+
+    def _evict(self, now: float):
+        while self._groups:
+            group = next(iter(self._groups.values()))
+            if now - group.last_seen <= self.ttl_seconds and len(self._groups) <= self.max_entries:
+                break
+            self._remove(group.key)
+            self.evicted += 1
+
+    def _remove(self, key: str):
+        group = self._groups.pop(key)
+        for table, band_key in zip(self._tables, self._band_keys(group.signature)):
+            members = table.get(band_key)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del table[band_key]
+        if group.source is not None and self._latest_by_source.get(group.source) == key:
+            del self._latest_by_source[group.source]
+
+    def get(self, key: str) -> Optional[DuplicateGroup]:
+        with self._lock:
+            return self._groups.get(key)
+
+    def attach_analysis(self, key: str, analysis: Dict):
+        with self._lock:
+            group = self._groups.get(key)
+            if group is not None:
+                group.analysis = analysis
+
+    def attach_embeddings(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[Optional[str]] = (),
+        metadatas: Sequence[Optional[dict]] = ()
+    ):
+        """vector_index listener'ı: indekslenen kanonik kayıtların embedding'ini sakla"""
+        with self._lock:
+            for issue_id, embedding in zip(ids, embeddings):
+                group = self._groups.get(issue_id)
+                if group is not None and group.embedding is None:
+                    group.embedding = list(embedding)
+
+    def groups(self, limit: int = 20, min_duplicates: int = 1) -> List[Dict]:
+        """En çok kopyası olan aktif gruplar"""
+        with self._lock:
+            active = [g for g in self._groups.values() if g.duplicates >= min_duplicates]
+        active.sort(key=lambda g: g.duplicates, reverse=True)
+        return [
+            {
+                "canonical_id": group.key,
+                "text": group.text,
+                "duplicates": group.duplicates,
+                "first_seen": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(group.first_seen)),
+                "last_seen": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(group.last_seen)),
+                "has_analysis": group.analysis is not None,
+                "has_embedding": group.embedding is not None
+            }
+            for group in active[:limit]
+        ]
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._groups),
+            "checks": self.checks,
+            "duplicates": self.duplicates,
+            "skipped_short": self.skipped,
+            "evicted": self.evicted,
+            "analysis_reuses": self.analysis_reuses,
+            "embedding_reuses": self.embedding_reuses,
+            "duplicate_rate": round(self.duplicates / self.checks, 4) if self.checks else 0.0
+        }
+
+
+# Müşteri sorunları (vektör deposu) ve tam konuşmalar (model analizi) için ayrı indeksler
+issue_duplicates = NearDuplicateIndex()
+conversation_duplicates = NearDuplicateIndex()
@@ -0,0 +1,293 @@
+"""
+Konuşma rollup tabloları: kayıt anında artımlı güncelleme, eksik bucket'lar için yeniden hesaplama
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import Conversation, ConversationRollup, SessionLocal
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+ROLLUP_DIMENSIONS = ("all", "category", "emotion")
+
+# Bucket başlangıcını üreten SQLite ifadeleri (yeniden hesaplamada kullanılır)
+BUCKET_FORMATS = {
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00"
+}
+
+DIMENSION_COLUMNS = {
+    "category": Conversation.category,
+    "emotion": Conversation.customer_emotion
+}
+
+SUM_FIELDS = (
+    "total", "resolved",
+    "sentiment_sum", "sentiment_count",
+    "resolution_sum", "resolution_count",
+    "performance_sum", "performance_count"
+)
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def conversation_dimensions(conversation: Conversation) -> List[Tuple[str, str]]:
+    dimensions = [("all", "")]
+    if conversation.category:
+        dimensions.append(("category", conversation.category))
+    if conversation.customer_emotion:
+        dimensions.append(("emotion", conversation.customer_emotion))
+    return dimensions
+
+
+def conversation_rollup_rows(conversation: Conversation) -> List[Dict]:
+    """Bir konuşmanın katkı yaptığı tüm rollup satırları (granularity x dimension)"""
+    # Boş (NULL/0) skorlar ortalamalara katılmaz
+    values = {
+        "total": 1,
+        "resolved": 1 if conversation.is_resolved else 0,
+        "sentiment_sum": conversation.sentiment_score or 0,
+        "sentiment_count": 1 if conversation.sentiment_score else 0,
+        "resolution_sum": conversation.resolution_score or 0,
+        "resolution_count": 1 if conversation.resolution_score else 0,
+        "performance_sum": conversation.agent_performance or 0,
+        "performance_count": 1 if conversation.agent_performance else 0
+    }
+    timestamp = conversation.timestamp or datetime.now()
+    return [
+        {
+            "granularity": granularity,
+            "bucket_start": bucket_start(timestamp, granularity),
+            "dimension": dimension,
+            "dimension_value": value,
+            "updated_at": datetime.now(),
+            **values
+        }
+        for granularity in ROLLUP_GRANULARITIES
+        for dimension, value in conversation_dimensions(conversation)
+    ]
+
+
+def upsert_rollup_rows(db: Session, rows: List[Dict]):
+    """Satırları rollup tablosuna ekle; bucket varsa sayaçları artır (commit etmez)"""
+    if not rows:
+        return
+    stmt = sqlite_insert(ConversationRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["granularity", "bucket_start", "dimension", "dimension_value"],
+        set_={
+            **{field: getattr(ConversationRollup, field) + getattr(stmt.excluded, field) for field in SUM_FIELDS},
+            "updated_at": stmt.excluded.updated_at
+        }
+    )
+    db.execute(stmt, rows)
+
+
+class RollupAccumulator:
+    """
+    Toplu yüklemede rollup'ları bellekte tek geçişte hesaplar: önce (saat, kategori, duygu)
+    başına ham toplamlar, sonra rows() ile tüm granularity x dimension satırları.
+    conversation_rollup_rows ile aynı kurallar (boş skorlar ortalamaya katılmaz).
+    """
+
+    def __init__(self):
+        self._groups: Dict[Tuple[datetime, str, str], List[float]] = {}
+
+    def add(
+        self,
+        timestamp: datetime,
+        category: Optional[str],
+        emotion: Optional[str],
+        is_resolved: bool,
+        sentiment: Optional[float],
+        resolution: Optional[float],
+        performance: Optional[float]
+    ):
+        key = (bucket_start(timestamp, "hour"), category or "", emotion or "")
+        sums = self._groups.get(key)
+        if sums is None:
+            sums = self._groups[key] = [0, 0, 0.0, 0, 0.0, 0, 0.0, 0]
+        sums[0] += 1
+        sums[1] += 1 if is_resolved else 0
+        if sentiment:
+            sums[2] += sentiment
+            sums[3] += 1
+        if resolution:
+            sums[4] += resolution
+            sums[5] += 1
+        if performance:
+            sums[6] += performance
+            sums[7] += 1
+
+    def rows(self) -> List[Dict]:
+        totals: Dict[Tuple, List[float]] = {}
+        for (hour, category, emotion), sums in self._groups.items():
+            dimensions = [("all", "")]
+            if category:
+                dimensions.append(("category", category))
+            if emotion:
+                dimensions.append(("emotion", emotion))
+            for granularity in ROLLUP_GRANULARITIES:
+                bucket = bucket_start(hour, granularity)
+                for dimension, value in dimensions:
+                    current = totals.setdefault((granularity, bucket, dimension, value), [0] * len(SUM_FIELDS))
+                    for i, amount in enumerate(sums):
+                        current[i] += amount
+        now = datetime.now()
+        return [
+            {
+                "granularity": granularity,
+                "bucket_start": bucket,
+                "dimension": dimension,
+                "dimension_value": value,
+                "updated_at": now,
+                **dict(zip(SUM_FIELDS, sums))
+            }
+            for (granularity, bucket, dimension, value), sums in totals.items()
+        ]
+
+
+def apply_conversation_to_rollups(db: Session, conversation: Conversation):
+    """Yeni kaydedilen konuşmayı rollup'lara ekle (aynı transaction içinde çağrılmalı)"""
+    upsert_rollup_rows(db, conversation_rollup_rows(conversation))
+
+
+def rebuild_rollups(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+    """[start, end) aralığındaki rollup'ları ham konuşmalardan yeniden hesapla"""
+    rollup_filter = []
+    conversation_filter = []
+    if start is not None:
+        rollup_filter.append(ConversationRollup.bucket_start >= start)
+        conversation_filter.append(Conversation.timestamp >= start)
+    if end is not None:
+        rollup_filter.append(ConversationRollup.bucket_start < end)
+        conversation_filter.append(Conversation.timestamp < end)
+
+    db.query(ConversationRollup).filter(*rollup_filter).delete(synchronize_session=False)
+
+    aggregates = (
+        func.count(Conversation.id).label("total"),
+        func.coalesce(func.sum(case((Conversation.is_resolved == True, 1), else_=0)), 0).label("resolved"),
+        func.coalesce(func.sum(Conversation.sentiment_score), 0).label("sentiment_sum"),
+        func.count(func.nullif(Conversation.sentiment_score, 0)).label("sentiment_count"),
+        func.coalesce(func.sum(Conversation.resolution_score), 0).label("resolution_sum"),
+        func.count(func.nullif(Conversation.resolution_score, 0)).label("resolution_count"),
+        func.coalesce(func.sum(Conversation.agent_performance), 0).label("performance_sum"),
+        func.count(func.nullif(Conversation.agent_performance, 0)).label("performance_count")
+    )
+
+    now = datetime.now()
+    rows = []
+    for granularity in ROLLUP_GRANULARITIES:
+        bucket = func.strftime(BUCKET_FORMATS[granularity], Conversation.timestamp).label("bucket")
+        for dimension in ROLLUP_DIMENSIONS:
+            column = DIMENSION_COLUMNS.get(dimension)
+            if column is None:
+                query = db.query(bucket, *aggregates).filter(*conversation_filter).group_by(bucket)
+            else:
+                query = db.query(bucket, column.label("value"), *aggregates).filter(
+                    *conversation_filter,
+                    column.isnot(None),
+                    column != ""
+                ).group_by(bucket, column)
+            for row in query:
+                rows.append({
+                    "granularity": granularity,
+                    "bucket_start": datetime.fromisoformat(row.bucket),
+                    "dimension": dimension,
+                    "dimension_value": row.value if column is not None else "",
+                    "updated_at": now,
+                    **{field: getattr(row, field) for field in SUM_FIELDS}
+                })
+
+    upsert_rollup_rows(db, rows)
+    db.commit()
+    return len(rows)
+
+
+def raw_day_counts(db: Session) -> Dict[Tuple[str, str, str], int]:
+    """Ham konuşmalardan (gün, dimension, değer) başına kayıt sayısı"""
+    day = func.date(Conversation.timestamp)
+    counts = {
+        (d, "all", ""): count
+        for d, count in db.query(day, func.count(Conversation.id)).group_by(day)
+    }
+    for dimension, column in DIMENSION_COLUMNS.items():
+        query = db.query(day, column, func.count(Conversation.id)).filter(
+            column.isnot(None),
+            column != ""
+        ).group_by(day, column)
+        counts.update({(d, dimension, value): count for d, value, count in query})
+    return counts
+
+
+def catch_up_rollups(db: Session) -> int:
+    """
+    Ham veriyle tutarsız (eksik/fazla) günleri bulup yeniden hesapla. Günlük toplamın yanında
+    kategori/duygu satırları da karşılaştırılır. Düzeltilen gün sayısını döner.
+    """
+    raw_counts = raw_day_counts(db)
+    rolled_counts = {
+        (row.bucket_start.date().isoformat(), row.dimension, row.dimension_value): row.total
+        for row in db.query(
+            ConversationRollup.bucket_start,
+            ConversationRollup.dimension,
+            ConversationRollup.dimension_value,
+            ConversationRollup.total
+        ).filter(ConversationRollup.granularity == "day")
+    }
+
+    stale_days = sorted({
+        key[0] for key in set(raw_counts) | set(rolled_counts)
+        if raw_counts.get(key, 0) != rolled_counts.get(key, 0)
+    })
+    for d in stale_days:
+        day_start = datetime.fromisoformat(d)
+        rebuild_rollups(db, day_start, day_start + timedelta(days=1))
+    return len(stale_days)
+
+
+def run_rollup_catch_up() -> int:
+    """Kendi session'ı ile catch-up (startup'ta arka planda çalıştırılır)"""
+    db = SessionLocal()
+    try:
+        fixed = catch_up_rollups(db)
+        if fixed:
+            print(f"✅ Rollup catch-up: {fixed} gün yeniden hesaplandı")
+        return fixed
+    except Exception as e:
+        print(f"Rollup catch-up error: {e}")
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
+def load_rollups(
+    db: Session,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    dimension: str = "all"
+) -> List[ConversationRollup]:
+    return db.query(ConversationRollup).filter(
+        ConversationRollup.granularity == granularity,
+        ConversationRollup.dimension == dimension,
+        ConversationRollup.bucket_start >= start,
+        ConversationRollup.bucket_start < end
+    ).order_by(ConversationRollup.bucket_start).all()
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print(f"✅ {rebuild_rollups(db)} rollup satırı yeniden hesaplandı")
+    finally:
+        db.close()
@@ -0,0 +1,86 @@
+"""
+Debounce'lu, "son gelen kazanır" iş zamanlayıcısı (canlı analiz gibi tekrar eden işler için)
+"""
+from typing import Awaitable, Callable, Optional
+import asyncio
+
+
+class LatestWinsScheduler:
+    """
+    Bir oturum için en fazla bir bekleyen ve bir çalışan iş tutar.
+
+    - schedule() çağrıları debounce süresi boyunca birleştirilir; her yeni çağrı
+      bekleyen zamanlayıcıyı iptal edip yeniden kurar (en fazla max_wait kadar ertelenir).
+    - İş çalışırken gelen çağrılar çalışan işi bekletmez; iş bitince en güncel durum
+      için tek bir takip çalıştırması yapılır (ara istekler atlanır).
+    - İş, çağıranın döngüsünden bağımsız bir task'ta çalışır.
+    """
+
+    def __init__(
+        self,
+        job: Callable[[], Awaitable[None]],
+        debounce: float = 0.8,
+        max_wait: float = 3.0,
+        name: str = "job"
+    ):
+        self.job = job
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.name = name
+        self._timer: Optional[asyncio.Task] = None
+        self._running: Optional[asyncio.Task] = None
+        self._first_request: Optional[float] = None
+        self._rerun = False
+        self.runs = 0
+        self.coalesced = 0
+
+    @property
+    def busy(self) -> bool:
+        return self._running is not None and not self._running.done()
+
+    def schedule(self):
+        """Yeni veri geldi: debounce sonrası işi (yeniden) çalıştır"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._first_request is None:
+            self._first_request = now
+        delay = min(self.debounce, max(0.0, self._first_request + self.max_wait - now))
+
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+            self.coalesced += 1
+        self._timer = asyncio.create_task(self._fire(delay))
+
+    def cancel(self):
+        """Bekleyen ve çalışan işi iptal et (bağlantı kapanınca / mod kapatılınca)"""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        if self._running is not None and not self._running.done():
+            self._running.cancel()
+        self._timer = None
+        self._running = None
+        self._first_request = None
+        self._rerun = False
+
+    async def _fire(self, delay: float):
+        await asyncio.sleep(delay)
+        if self.busy:
+            # Çalışan iş bitince en güncel veriyle bir kez daha çalıştırılacak
+            self._rerun = True
+            return
+        self._first_request = None
+        self._running = asyncio.create_task(self._run())
+
+    async def _run(self):
+        try:
+            self.runs += 1
+            await self.job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Scheduler ({self.name}) job error: {e}")
+        finally:
+            if self._rerun:
+                self._rerun = False
+                self._running = None
+                self.schedule()
@@ -1,10 +1,22 @@
 """
 Veritabanını telekomunikasyon sektörüne uygun gerçekçi örneklerle dolduran seed script
 """
+from collections import Counter
 from datetime import datetime, timedelta
-from database import get_db, Conversation, DailyReport, add_issue_to_vector_db
+from typing import Dict, List, Optional, Tuple
+from database import (
+    get_db, chroma_client, issues_collection, embed_documents,
+    Conversation, ConversationRollup, DailyReport, EmbeddingError
+)
+from rollups import RollupAccumulator, upsert_rollup_rows
+from sqlalchemy import case, func, insert
 from sqlalchemy.orm import Session
+import argparse
 import random
+import time
+
+# Tek transaction'da eklenecek konuşma sayısı
+SEED_BATCH_SIZE = 10000
 
 # Gerçekçi telekom konuşma örnekleri
 SAMPLE_CONVERSATIONS = [
@@ -277,128 +289,229 @@ SAMPLE_CONVERSATIONS = [
     }
 ]
 
-def seed_database():
-    """Veritabanını örnek verilerle doldur"""
+def prepare_samples() -> List[Dict]:
+    """Örnek konuşmaların birleştirilmiş metinleri (her satır için tekrar hesaplanmasın)"""
+    return [
+        {
+            **sample,
+            "customer_text": " | ".join(msg["content"] for msg in sample["messages"] if msg["sender"] == "customer"),
+            "agent_text": " | ".join(msg["content"] for msg in sample["messages"] if msg["sender"] == "agent"),
+            "issue_text": " ".join(msg["content"] for msg in sample["messages"] if msg["sender"] == "customer")
+        }
+        for sample in SAMPLE_CONVERSATIONS
+    ]
+
+def sample_embeddings(samples: List[Dict]) -> Optional[List[List[float]]]:
+    """Her örnek metin için tek embedding (aynı metinli konuşmalar bu vektörü paylaşır)"""
+    try:
+        return embed_documents([sample["issue_text"] for sample in samples])
+    except EmbeddingError as e:
+        print(f"⚠️ Embedding alınamadı, vektör DB atlanıyor ({e}). Sonra: python vector_index.py --reindex")
+        return None
+
+def write_vectors(items: List[Tuple[int, int, datetime]], samples: List[Dict], embeddings: List[List[float]]):
+    """(konuşma id, örnek index, zaman) listesini tek upsert ile vektör DB'ye yaz"""
+    issues_collection.upsert(
+        ids=[f"conv_{conversation_id}" for conversation_id, _, _ in items],
+        embeddings=[embeddings[index] for _, index, _ in items],
+        documents=[samples[index]["issue_text"] for _, index, _ in items],
+        metadatas=[
+            {
+                "category": samples[index]["category"],
+                "emotion": samples[index]["emotion"],
+                "date": conversation_time.isoformat(),
+                "ts": conversation_time.timestamp(),
+                "is_resolved": samples[index]["resolution_status"] == "resolved"
+            }
+            for _, index, conversation_time in items
+        ]
+    )
+
+def daily_report_row(day: datetime, stats: Dict) -> Dict:
+    total = stats["total"]
+    return {
+        "date": day,
+        "total_conversations": total,
+        "resolved_conversations": stats["resolved"],
+        "avg_sentiment": stats["sentiment_sum"] / total,
+        "avg_satisfaction": stats["sentiment_sum"] / total,
+        "avg_performance": stats["performance_sum"] / total,
+        "top_emotion": stats["emotions"].most_common(1)[0][0] if stats["emotions"] else None,
+        "top_category": stats["categories"].most_common(1)[0][0] if stats["categories"] else None,
+        "created_at": datetime.now()
+    }
+
+def seed_database(
+    days: int = 7,
+    per_day: Optional[int] = None,
+    seed: Optional[int] = None,
+    batch_size: int = SEED_BATCH_SIZE,
+    vectors: Optional[int] = None,
+    end_date: Optional[datetime] = None
+):
+    """
+    Veritabanını örnek verilerle doldur
+
+    days      : end_date'ten geriye gün sayısı (end_date dahil days + 1 gün)
+    per_day   : günlük ortalama konuşma sayısı (verilmezse 5-15 arası, küçük demo verisi)
+    seed      : aynı seed (ve aynı end_date) ile aynı veri üretilir
+    batch_size: tek transaction'da eklenecek satır sayısı
+    vectors   : vektör DB'ye eklenecek en fazla konuşma (None: hepsi, 0: hiçbiri)
+    end_date  : üretilen son gün (None: bugün)
+    """
     db: Session = next(get_db())
+    rng = random.Random(seed)
+    started = time.perf_counter()
     
     print("🌱 Veritabanı seed işlemi başlıyor...")
     
     # Mevcut verileri temizle
     db.query(Conversation).delete()
     db.query(DailyReport).delete()
+    db.query(ConversationRollup).delete()
     db.commit()
     print("✅ Mevcut veriler temizlendi")
     
-    # Son 7 gün için konuşmalar ekle (bugün dahil 8 gün)
-    base_date = datetime.now() - timedelta(days=7)
+    samples = prepare_samples()
+    embeddings = sample_embeddings(samples) if vectors != 0 else None
+    vector_limit = 0 if embeddings is None else vectors
+    vector_batch_size = min(batch_size, chroma_client.max_batch_size)
+    # ORM nesnesi üretmeden Core executemany ile ekleme
+    conversation_insert = insert(Conversation.__table__)
     
+    # Rollup'lar ve günlük raporlar satırlar üretilirken tek geçişte hesaplanır
+    rollups = RollupAccumulator()
+    daily_reports = []
+    rows: List[Dict] = []
+    vector_items: List[Tuple[int, int, datetime]] = []
     total_conversations = 0
+    total_vectors = 0
+    
+    base_date = (end_date or datetime.now()) - timedelta(days=days)
     
-    for day in range(8):  # 0-7 = 8 gün (bugün dahil)
+    for day in range(days + 1):  # Son gün dahil
         current_date = base_date + timedelta(days=day)
         
-        # Her gün için rastgele sayıda konuşma (5-15 arası)
-        conversations_per_day = random.randint(5, 15)
+        if per_day is None:
+            conversations_per_day = rng.randint(5, 15)
+        else:
+            conversations_per_day = max(0, round(rng.gauss(per_day, per_day * 0.1)))
+        
+        day_stats = {
+            "total": 0, "resolved": 0, "sentiment_sum": 0.0, "performance_sum": 0.0,
+            "emotions": Counter(), "categories": Counter()
+        }
         
         for i in range(conversations_per_day):
-            # Rastgele bir örnek seç
-            sample = random.choice(SAMPLE_CONVERSATIONS)
-            
-            # Rastgele saat ekle (09:00 - 20:00 arası)
-            hour = random.randint(9, 20)
-            minute = random.randint(0, 59)
-            conversation_time = current_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            sample_index = rng.randrange(len(samples))
+            sample = samples[sample_index]
             
-            # Müşteri ve agent mesajlarını birleştir
-            customer_msgs = " | ".join([msg["content"] for msg in sample["messages"] if msg["sender"] == "customer"])
-            agent_msgs = " | ".join([msg["content"] for msg in sample["messages"] if msg["sender"] == "agent"])
-            
-            # Konuşmayı oluştur (database.py modeline uygun)
-            conversation = Conversation(
-                session_id=f"session_{random.randint(1000, 9999)}_{day}_{i}",
-                customer_message=customer_msgs,
-                agent_message=agent_msgs,
-                timestamp=conversation_time,
-                sentiment_score=sample["sentiment_score"],
-                resolution_score=sample["sentiment_score"] + random.uniform(0.05, 0.15),
-                agent_performance=random.uniform(0.70, 0.95),
-                overall_score=sample["sentiment_score"],
-                is_resolved=(sample["resolution_status"] == "resolved"),
-                customer_emotion=sample["emotion"],
-                response_time=f"{random.randint(30, 300)}s",
-                empathy_level=random.choice(["high", "medium", "low"]),
-                category=sample["category"],
-                keywords=sample["tags"]
+            # Rastgele saat (09:00 - 20:59 arası)
+            conversation_time = current_date.replace(
+                hour=rng.randint(9, 20), minute=rng.randint(0, 59), second=rng.randint(0, 59), microsecond=0
             )
-            
-            db.add(conversation)
-            
-            # Vector DB'ye sorun ekle
-            if sample["messages"]:
-                issue_text = " ".join([msg["content"] for msg in sample["messages"] if msg["sender"] == "customer"])
-                add_issue_to_vector_db(
-                    issue_id=f"conv_{total_conversations}",
-                    issue_text=issue_text,
-                    metadata={
-                        "category": sample["category"],
-                        "emotion": sample["emotion"],
-                        "date": conversation_time.isoformat()
-                    }
-                )
-            
             total_conversations += 1
-        
-        # Her gün için günlük rapor oluştur
-        daily_stats = db.query(Conversation).filter(
-            Conversation.timestamp >= current_date.date(),
-            Conversation.timestamp < (current_date + timedelta(days=1)).date()
-        ).all()
-        
-        if daily_stats:
-            total = len(daily_stats)
-            resolved = sum(1 for c in daily_stats if c.is_resolved)
-            avg_sentiment = sum(c.sentiment_score for c in daily_stats) / total
-            avg_satisfaction = sum(c.sentiment_score for c in daily_stats) / total
-            avg_performance = sum(c.agent_performance for c in daily_stats if c.agent_performance) / total
-            
-            # En çok görülen duygu
-            emotions = [c.customer_emotion for c in daily_stats if c.customer_emotion]
-            top_emotion = max(set(emotions), key=emotions.count) if emotions else None
             
-            # En çok görülen kategori
-            categories = [c.category for c in daily_stats if c.category]
-            top_category = max(set(categories), key=categories.count) if categories else None
+            row = {
+                "id": total_conversations,  # Vektör DB id'si (conv_<id>) ile eşleşsin
+                "session_id": f"session_{rng.randint(1000, 9999)}_{day}_{i}",
+                "customer_message": sample["customer_text"],
+                "agent_message": sample["agent_text"],
+                "timestamp": conversation_time,
+                "sentiment_score": sample["sentiment_score"],
+                "resolution_score": sample["sentiment_score"] + rng.uniform(0.05, 0.15),
+                "agent_performance": rng.uniform(0.70, 0.95),
+                "overall_score": sample["sentiment_score"],
+                "is_resolved": sample["resolution_status"] == "resolved",
+                "customer_emotion": sample["emotion"],
+                "response_time": f"{rng.randint(30, 300)}s",
+                "empathy_level": rng.choice(["high", "medium", "low"]),
+                "category": sample["category"],
+                "keywords": sample["tags"]
+            }
+            rows.append(row)
             
-            daily_report = DailyReport(
-                date=current_date,
-                total_conversations=total,
-                resolved_conversations=resolved,
-                avg_sentiment=avg_sentiment,
-                avg_satisfaction=avg_satisfaction,
-                avg_performance=avg_performance,
-                top_emotion=top_emotion,
-                top_category=top_category
+            rollups.add(
+                conversation_time, row["category"], row["customer_emotion"], row["is_resolved"],
+                row["sentiment_score"], row["resolution_score"], row["agent_performance"]
             )
+            day_stats["total"] += 1
+            day_stats["resolved"] += row["is_resolved"]
+            day_stats["sentiment_sum"] += row["sentiment_score"]
+            day_stats["performance_sum"] += row["agent_performance"]
+            day_stats["emotions"][row["customer_emotion"]] += 1
+            day_stats["categories"][row["category"]] += 1
+            
+            if vector_limit is None or total_vectors + len(vector_items) < vector_limit:
+                vector_items.append((row["id"], sample_index, conversation_time))
             
-            db.add(daily_report)
+            # Büyük transaction'larla toplu ekleme
+            if len(rows) >= batch_size:
+                db.execute(conversation_insert, rows)
+                db.commit()
+                rows.clear()
+                print(f"   {total_conversations} konuşma eklendi ({time.perf_counter() - started:.1f}s)")
+            if len(vector_items) >= vector_batch_size:
+                write_vectors(vector_items, samples, embeddings)
+                total_vectors += len(vector_items)
+                vector_items.clear()
+        
+        if day_stats["total"]:
+            daily_reports.append(daily_report_row(current_date, day_stats))
     
+    if rows:
+        db.execute(conversation_insert, rows)
+    if daily_reports:
+        db.execute(insert(DailyReport), daily_reports)
+    rollup_rows = rollups.rows()
+    upsert_rollup_rows(db, rollup_rows)
     db.commit()
     
-    print(f"✅ {total_conversations} konuşma eklendi")
-    print(f"✅ {total_conversations} vector DB kaydı eklendi")
-    print(f"✅ 7 günlük rapor oluşturuldu")
-    print("🎉 Seed işlemi tamamlandı!")
+    if vector_items:
+        write_vectors(vector_items, samples, embeddings)
+        total_vectors += len(vector_items)
+    
+    elapsed = time.perf_counter() - started
+    print(f"✅ {total_conversations} konuşma eklendi ({total_conversations / max(elapsed, 1e-9):.0f} satır/s)")
+    print(f"✅ {total_vectors} vector DB kaydı eklendi")
+    print(f"✅ {len(daily_reports)} günlük rapor, {len(rollup_rows)} rollup bucket'ı oluşturuldu")
+    print(f"🎉 Seed işlemi tamamlandı! ({elapsed:.1f}s)")
     
     # İstatistikler
+    total, resolved, avg_sentiment = db.query(
+        func.count(Conversation.id),
+        func.sum(case((Conversation.is_resolved == True, 1), else_=0)),
+        func.avg(Conversation.sentiment_score)
+    ).one()
     print("\n📊 Veritabanı İstatistikleri:")
-    print(f"Toplam Konuşma: {db.query(Conversation).count()}")
-    print(f"Çözülen: {db.query(Conversation).filter(Conversation.is_resolved == True).count()}")
-    print(f"Bekleyen: {db.query(Conversation).filter(Conversation.is_resolved == False).count()}")
-    all_convs = db.query(Conversation).all()
-    if all_convs:
-        print(f"Ortalama Memnuniyet: {sum(c.sentiment_score for c in all_convs) / len(all_convs):.2f}")
+    print(f"Toplam Konuşma: {total}")
+    print(f"Çözülen: {resolved or 0}")
+    print(f"Bekleyen: {total - (resolved or 0)}")
+    if total:
+        print(f"Ortalama Memnuniyet: {avg_sentiment:.2f}")
     
     db.close()
 
 if __name__ == "__main__":
-    seed_database()
+    # python seed.py                                         -> küçük demo verisi (son 7 gün)
+    # python seed.py --days 90 --per-day 20000 --seed 42     -> üretim ölçeğinde veri (benchmark)
+    # python seed.py --seed 42 --base-date 2026-03-31        -> her çalıştırmada birebir aynı veri
+    parser = argparse.ArgumentParser(description="Örnek konuşma verisi üret")
+    parser.add_argument("--days", type=int, default=7, help="Son günden geriye gün sayısı")
+    parser.add_argument("--per-day", type=int, default=None, help="Günlük ortalama konuşma sayısı")
+    parser.add_argument("--seed", type=int, default=None, help="Tekrarlanabilir veri için rastgelelik seed'i")
+    parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE, help="Transaction başına satır")
+    parser.add_argument("--vectors", type=int, default=None, help="Vektör DB'ye eklenecek en fazla konuşma (0: hiç)")
+    parser.add_argument(
+        "--base-date", type=datetime.fromisoformat, default=None,
+        help="Üretilen son gün, YYYY-MM-DD (varsayılan bugün; --seed ile birlikte tekrarlanabilir veri)"
+    )
+    args = parser.parse_args()
+    seed_database(
+        days=args.days,
+        per_day=args.per_day,
+        seed=args.seed,
+        batch_size=max(1, args.batch_size),
+        vectors=args.vectors,
+        end_date=args.base_date
+    )
@@ -0,0 +1,199 @@
+"""
+Benzer geçmiş sorun araması: metadata filtreleri, sonuç önbelleği ve gecikme bütçesi
+
+Sorgu embedding'leri embed_documents üzerinden embedding önbelleğine düşer; sonuç listeleri
+(normalize metin + filtreler + limit) anahtarıyla TTL'li LRU'da tutulur. Arama bütçeyi
+(SIMILAR_ISSUES_TIMEOUT_MS) aşarsa çağıran beklemez: varsa süresi dolmuş sonuç, yoksa boş
+liste döner; arka planda süren arama bitince sonucu önbelleğe yazar.
+"""
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+import asyncio
+import json
+import os
+import threading
+import time
+
+from analysis_cache import normalize_conversation
+from database import find_similar_issues
+
+SIMILAR_ISSUES_TIMEOUT_MS = float(os.getenv("SIMILAR_ISSUES_TIMEOUT_MS", "40"))
+SIMILAR_ISSUES_CACHE_SIZE = int(os.getenv("SIMILAR_ISSUES_CACHE_SIZE", "1024"))
+SIMILAR_ISSUES_CACHE_TTL = float(os.getenv("SIMILAR_ISSUES_CACHE_TTL", "300"))
+SIMILAR_ISSUES_WORKERS = int(os.getenv("SIMILAR_ISSUES_WORKERS", "2"))
+SIMILAR_ISSUES_MAX_RESULTS = 50
+
+
+def build_where(
+    category: Optional[str] = None,
+    resolved: Optional[bool] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Optional[Dict]:
+    """Filtreleri Chroma where ifadesine çevir (tarih aralığı "ts" epoch alanı üzerinden)"""
+    conditions = []
+    if category:
+        conditions.append({"category": category})
+    if resolved is not None:
+        conditions.append({"is_resolved": resolved})
+    if start is not None:
+        conditions.append({"ts": {"$gte": start.timestamp()}})
+    if end is not None:
+        conditions.append({"ts": {"$lte": end.timestamp()}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def format_results(results: Optional[Dict]) -> List[Dict]:
+    if not results or not results.get("ids") or not results["ids"][0]:
+        return []
+    documents = results.get("documents") or [[None] * len(results["ids"][0])]
+    metadatas = results.get("metadatas") or [[None] * len(results["ids"][0])]
+    distances = results.get("distances") or [[None] * len(results["ids"][0])]
+    return [
+        {
+            "id": issue_id,
+            "text": document,
+            "distance": round(distance, 4) if distance is not None else None,
+            "metadata": metadata or {}
+        }
+        for issue_id, document, metadata, distance in zip(
+            results["ids"][0], documents[0], metadatas[0], distances[0]
+        )
+    ]
+
+
+class SimilarIssueSearch:
+    """Önbellekli, zaman bütçeli benzer sorun araması"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, timeout_ms: float, workers: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout_ms / 1000
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="similar-issues")
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _key(self, text: str, where: Optional[Dict], limit: int) -> str:
+        return json.dumps([text, where, limit], sort_keys=True, ensure_ascii=False)
+
+    def _remember(self, key: str, results: List[Dict]):
+        with self._lock:
+            self._cache[key] = (time.monotonic(), results)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _lookup(self, text: str, where: Optional[Dict], limit: int) -> List[Dict]:
+        results = find_similar_issues(text, n_results=limit, where=where)
+        if results is None:
+            # Hata sonucu önbelleğe yazılmasın
+            raise RuntimeError("vector search failed")
+        return format_results(results)
+
+    async def search(self, text: str, where: Optional[Dict] = None, limit: int = 5) -> Dict:
+        """
+        Dönüş: {"results", "cached", "timed_out", "stale", "latency_ms", "pending"}
+        pending: bütçe aşıldıysa arka planda süren aramanın (concurrent) future'ı
+        """
+        started = time.perf_counter()
+        text = normalize_conversation(text)
+        key = self._key(text, where, limit)
+
+        started_lookup = False
+        with self._lock:
+            cached = self._cache.get(key)
+            fresh = cached is not None and time.monotonic() - cached[0] < self.ttl_seconds
+            if fresh:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                # Aynı sorgu zaten çalışıyorsa ona katıl
+                future = self._in_flight.get(key)
+                if future is None:
+                    future = self.executor.submit(self._lookup, text, where, limit)
+                    self._in_flight[key] = future
+                    started_lookup = True
+        if fresh:
+            return self._response(cached[1], started, cached=True)
+        if started_lookup:
+            # Kilit dışında: arama zaten bittiyse _finish bu thread'de hemen çalışır ve kilidi alır
+            future.add_done_callback(lambda f, key=key: self._finish(key, f))
+
+        try:
+            results = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=self.timeout)
+            return self._response(results, started)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            if cached:
+                self.stale_hits += 1
+                return self._response(cached[1], started, cached=True, timed_out=True, stale=True, pending=future)
+            return self._response([], started, timed_out=True, pending=future)
+        except Exception:
+            # Vektör araması başarısız: canlı akışı bozmadan boş sonuç
+            self.errors += 1
+            if cached:
+                return self._response(cached[1], started, cached=True, stale=True)
+            return self._response([], started)
+
+    def _finish(self, key: str, future: Future):
+        """Arama thread'inde çalışır: sonucu önbelleğe yaz"""
+        if not future.cancelled() and future.exception() is None:
+            self._remember(key, future.result())
+        elif not future.cancelled():
+            print(f"Similar issues error: {future.exception()}")
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    @staticmethod
+    def _response(
+        results: List[Dict],
+        started: float,
+        cached: bool = False,
+        timed_out: bool = False,
+        stale: bool = False,
+        pending: Optional[Future] = None
+    ) -> Dict:
+        return {
+            "results": results,
+            "cached": cached,
+            "timed_out": timed_out,
+            "stale": stale,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            "pending": pending
+        }
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "timeout_ms": self.timeout * 1000
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+similar_issue_search = SimilarIssueSearch(
+    SIMILAR_ISSUES_CACHE_SIZE,
+    SIMILAR_ISSUES_CACHE_TTL,
+    SIMILAR_ISSUES_TIMEOUT_MS,
+    SIMILAR_ISSUES_WORKERS
+)
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# Backend modülleri düz (paket değil) yapıda; testler backend/ dizininden import eder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# database.py göreli yollar kullanır (./callcenter.db, ./chroma_db); testler geçici dizinde çalışır
+os.chdir(tempfile.mkdtemp(prefix="callcenter-tests-"))
+os.environ.setdefault("GPT_OSS_API_KEY", "test")
+os.environ.setdefault("EMBEDDING_CACHE_DIR", "")
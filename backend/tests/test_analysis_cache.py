@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+import analysis_cache
+from analysis_cache import AnalysisCache, make_cache_key
+
+ANALYSIS = {"sentiment": 7, "insights": [{"type": "info", "text": "ok"}]}
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(analysis_cache.time, "time", clock)
+    return clock
+
+
+def drain(cache):
+    """Disk thread'inde sıradaki toplu yazmanın bitmesini bekle"""
+    cache._disk_pool.submit(lambda: None).result()
+
+
+def test_whitespace_variants_share_a_key():
+    a = make_cache_key("Müşteri: merhaba\nTemsilci: buyurun", "v1")
+    b = make_cache_key("  Müşteri:   merhaba  \n\n Temsilci: buyurun\n", "v1")
+    assert a == b
+    assert a != make_cache_key("Müşteri: merhaba\nTemsilci: buyurun", "v2")
+
+
+def test_hit_after_normalization_equivalent_input():
+    cache = AnalysisCache()
+    cache.set(make_cache_key("Müşteri: fatura\nTemsilci: bakıyorum", "v1"), ANALYSIS)
+    key = make_cache_key("Müşteri:  fatura \n\nTemsilci: bakıyorum  ", "v1")
+    assert asyncio.run(cache.get(key)) == ANALYSIS
+    assert cache.hits == 1 and cache.misses == 0
+
+
+def test_returned_value_is_a_copy():
+    cache = AnalysisCache()
+    cache.set("k", ANALYSIS)
+    asyncio.run(cache.get("k"))["insights"].clear()
+    assert asyncio.run(cache.get("k")) == ANALYSIS
+
+
+def test_expired_entry_is_a_miss(clock):
+    cache = AnalysisCache(ttl_seconds=60)
+    cache.set("k", ANALYSIS)
+    clock.now += 61
+    assert asyncio.run(cache.get("k")) is None
+    assert cache.misses == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_disk_entry_is_promoted_after_memory_eviction(tmp_path):
+    cache = AnalysisCache(max_entries=1, db_path=str(tmp_path / "cache.db"))
+    try:
+        cache.set("a", ANALYSIS)
+        cache.set("b", {"sentiment": 1})
+        drain(cache)
+        assert list(cache._memory) == ["b"]
+
+        assert asyncio.run(cache.get("a")) == ANALYSIS
+        assert cache.disk_hits == 1
+        assert list(cache._memory) == ["a"]
+
+        # Artık bellekte: ikinci okuma diske gitmez
+        assert asyncio.run(cache.get("a")) == ANALYSIS
+        assert cache.disk_hits == 1
+    finally:
+        cache.close()
+
+
+def test_expired_disk_entry_is_a_miss(tmp_path, clock):
+    cache = AnalysisCache(max_entries=1, ttl_seconds=60, db_path=str(tmp_path / "cache.db"))
+    try:
+        cache.set("a", ANALYSIS)
+        cache.set("b", ANALYSIS)
+        drain(cache)
+        clock.now += 61
+        assert asyncio.run(cache.get("a")) is None
+        assert cache.disk_hits == 0
+    finally:
+        cache.close()
+
+
+def test_purge_removes_only_expired_disk_rows(tmp_path, clock):
+    cache = AnalysisCache(ttl_seconds=60, db_path=str(tmp_path / "cache.db"))
+    try:
+        cache.set("old", ANALYSIS)
+        drain(cache)
+        clock.now += 61
+        cache.set("fresh", ANALYSIS)
+        drain(cache)
+
+        assert asyncio.run(cache.purge_expired()) == 1
+        assert cache.purged == 1
+        keys = [row[0] for row in cache._db.execute("SELECT key FROM analysis_cache")]
+        assert keys == ["fresh"]
+    finally:
+        cache.close()
+
+
+def test_purge_without_disk_tier_is_noop():
+    assert asyncio.run(AnalysisCache().purge_expired()) == 0
@@ -0,0 +1,117 @@
+import json
+import random
+
+import pytest
+
+from analysis_stream import AnalysisStreamParser
+
+ANALYSIS = {
+    "sentiment": 7,
+    "resolution": 10,
+    "agentPerformance": 8,
+    "insights": [
+        {"type": "success", "text": "Temsilci \"hemen\" çözüm sundu"},
+        {"type": "warning", "text": "Satır\nsonu ve ters \\ bölü"},
+        {"type": "info", "text": "Müşteri {memnun} [değil] çok \U0001F600"}
+    ],
+    "metrics": {
+        "responseTime": "Hızlı",
+        "empathyLevel": "Yüksek",
+        "problemResolved": True,
+        "customerEmotion": "Pozitif"
+    }
+}
+# ensure_ascii=True: ç ve emoji surrogate çifti (😀) kaçış dizisi olarak gelir
+RAW = "```json\n" + json.dumps(ANALYSIS, ensure_ascii=True, indent=2) + "\n```"
+
+EXPECTED_EVENTS = [
+    {"field": "sentiment", "value": 7},
+    {"field": "resolution", "value": 10},
+    {"field": "agentPerformance", "value": 8},
+    {"field": "insights", "index": 0, "value": ANALYSIS["insights"][0]},
+    {"field": "insights", "index": 1, "value": ANALYSIS["insights"][1]},
+    {"field": "insights", "index": 2, "value": ANALYSIS["insights"][2]},
+    {"field": "metrics", "value": ANALYSIS["metrics"]}
+]
+
+
+def feed_all(chunks):
+    parser = AnalysisStreamParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return parser, events
+
+
+def split_at(text, points):
+    bounds = [0] + sorted(points) + [len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def assert_complete(parser, events):
+    assert events == EXPECTED_EVENTS
+    assert parser.done
+    assert parser.fields == ANALYSIS
+
+
+def test_whole_text_in_one_chunk():
+    assert_complete(*feed_all([RAW]))
+
+
+def test_single_character_chunks():
+    assert_complete(*feed_all(list(RAW)))
+
+
+def test_random_chunking():
+    rng = random.Random(1234)
+    for _ in range(20):
+        points = rng.sample(range(1, len(RAW)), rng.randint(2, 40))
+        assert_complete(*feed_all(split_at(RAW, points)))
+
+
+@pytest.mark.parametrize("marker, offset", [
+    ('"agentPerformance"', 6),  # anahtarın ortası
+    ('\\"hemen', 1),            # \ ile " arası
+    ("\\\\ b", 1),              # çift ters bölünün arası
+    ("\\u00e7", 4),             # ç kaçışının ortası
+    ("\\ud83d\\ude00", 6),      # surrogate çiftinin arası
+    ('"sentiment":', 12),       # : ile değer arası
+    ('"resolution": 10', 15),   # sayının ortası
+    ('"insights": [', 12),      # dizi açılmadan hemen önce
+    ("}\n  ],", 4),             # dizi kapanışından hemen önce
+])
+def test_split_inside_tokens(marker, offset):
+    index = RAW.index(marker) + offset
+    assert_complete(*feed_all([RAW[:index], RAW[index:]]))
+
+
+def test_partial_events_arrive_before_the_end():
+    head = RAW[:RAW.index('"insights"')]
+    parser = AnalysisStreamParser()
+    events = parser.feed(head)
+    assert events == EXPECTED_EVENTS[:3]
+    assert not parser.done
+
+    second_item = RAW.index('"type": "warning"')
+    events = parser.feed(RAW[len(head):second_item])
+    assert events == EXPECTED_EVENTS[3:4]
+
+    events = parser.feed(RAW[second_item:])
+    assert events == EXPECTED_EVENTS[4:]
+    assert parser.fields == ANALYSIS
+
+
+def test_number_is_not_emitted_until_delimiter():
+    parser = AnalysisStreamParser()
+    assert parser.feed('{"sentiment": 7') == []
+    assert parser.feed('0, "resolution": 5}') == [
+        {"field": "sentiment", "value": 70},
+        {"field": "resolution", "value": 5}
+    ]
+    assert parser.done
+
+
+def test_text_after_root_object_is_ignored():
+    parser, events = feed_all(['{"sentiment": 3}', ' trailing {"sentiment": 9}'])
+    assert events == [{"field": "sentiment", "value": 3}]
+    assert parser.fields == {"sentiment": 3}
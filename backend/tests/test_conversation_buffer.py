@@ -0,0 +1,65 @@
+from conversation_buffer import CHARS_PER_TOKEN, ConversationBuffer, estimate_tokens
+
+
+def filled(lines, **kwargs):
+    buffer = ConversationBuffer(**kwargs)
+    for line in lines:
+        buffer.append(line)
+    return buffer
+
+
+def test_roles_are_parsed_from_prefixes():
+    buffer = filled(["Müşteri: İnternetim yok", "Temsilci: Kontrol ediyorum", "sistem notu"])
+    assert [turn.role for turn in buffer.turns] == ["customer", "agent", "unknown"]
+    assert buffer.messages("customer") == ["İnternetim yok"]
+    assert buffer.render() == "Müşteri: İnternetim yok\nTemsilci: Kontrol ediyorum\nsistem notu\n"
+
+
+def test_render_without_budget_returns_everything_and_is_cached():
+    buffer = filled(["Müşteri: a", "Temsilci: b"])
+    first = buffer.render()
+    assert buffer.render() is first
+    buffer.append("Müşteri: c")
+    assert buffer.render().endswith("Müşteri: c\n")
+
+
+def test_render_within_budget_returns_full_text():
+    buffer = filled(["Müşteri: kısa", "Temsilci: kısa"])
+    assert buffer.render(max_tokens=1000) == buffer.render()
+
+
+def test_render_keeps_newest_turns_that_fit_the_budget():
+    lines = [f"Müşteri: mesaj {i} " + "x" * 40 for i in range(20)]
+    buffer = filled(lines)
+    budget = estimate_tokens(lines[-1]) * 3
+    rendered = buffer.render(max_tokens=budget)
+
+    kept = rendered.splitlines()
+    assert kept == lines[-3:]
+    assert sum(estimate_tokens(line) for line in kept) <= budget
+
+
+def test_render_always_includes_newest_turn_even_if_over_budget():
+    long_line = "Müşteri: " + "y" * (CHARS_PER_TOKEN * 50)
+    buffer = filled(["Temsilci: merhaba", long_line])
+    assert buffer.render(max_tokens=10) == long_line + "\n"
+
+
+def test_limits_drop_oldest_turns():
+    buffer = filled([f"Müşteri: {i}" for i in range(10)], max_turns=4)
+    assert buffer.messages("customer") == ["6", "7", "8", "9"]
+
+    buffer = filled(["Müşteri: " + "z" * 50 for _ in range(5)], max_chars=130)
+    assert len(buffer) == 2
+    assert buffer.total_chars <= 130
+
+
+def test_blank_turns_and_clear():
+    buffer = filled(["", "   "])
+    assert buffer.is_empty()
+    buffer.append("Müşteri: selam")
+    assert not buffer.is_empty()
+    version = buffer.version
+    buffer.clear()
+    assert buffer.is_empty() and len(buffer) == 0 and buffer.version == version + 1
+    assert buffer.render() == ""
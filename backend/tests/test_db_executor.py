@@ -0,0 +1,98 @@
+import asyncio
+from concurrent.futures import Future
+
+import pytest
+
+from database import Conversation, SessionLocal
+from db_executor import BatchWriter, DBExecutor
+
+
+@pytest.fixture
+def writer():
+    session = SessionLocal()
+    session.query(Conversation).delete()
+    session.commit()
+    session.close()
+    # Uzun gecikme: aynı anda gönderilen işler tek gruba düşsün
+    writer = BatchWriter(batch_size=16, max_delay_ms=500)
+    yield writer
+    writer.shutdown()
+
+
+def add_conversation(db, session_id):
+    conversation = Conversation(session_id=session_id, customer_message="m", agent_message="a")
+    db.add(conversation)
+    db.flush()
+    return conversation.id
+
+
+def fail(db, session_id):
+    add_conversation(db, session_id)
+    raise ValueError("bozuk kayıt")
+
+
+def stored_session_ids():
+    session = SessionLocal()
+    try:
+        return sorted(row.session_id for row in session.query(Conversation.session_id))
+    finally:
+        session.close()
+
+
+def submit_all(writer, jobs):
+    async def scenario():
+        return await asyncio.gather(*(writer.submit(fn, sid) for fn, sid in jobs), return_exceptions=True)
+    return asyncio.run(scenario())
+
+
+def test_concurrent_writes_share_one_commit(writer):
+    ids = submit_all(writer, [(add_conversation, f"s{i}") for i in range(5)])
+
+    assert all(isinstance(i, int) for i in ids)
+    assert len(set(ids)) == 5
+    assert writer.batches == 1
+    assert writer.committed == 5
+    assert writer.last_batch_size == 5
+    assert stored_session_ids() == [f"s{i}" for i in range(5)]
+
+
+def test_failing_job_does_not_drop_its_batch(writer):
+    results = submit_all(writer, [(add_conversation, "ok1"), (fail, "bad"), (add_conversation, "ok2")])
+
+    assert isinstance(results[0], int) and isinstance(results[2], int)
+    assert isinstance(results[1], ValueError)
+    assert writer.retried_batches == 1
+    assert writer.committed == 2
+    assert writer.failed == 1
+    # Geri alınan grubun hatalı kaydı tekrar denemede de yazılmaz
+    assert stored_session_ids() == ["ok1", "ok2"]
+
+
+def test_shutdown_flushes_queued_jobs(writer):
+    futures = []
+    for i in range(3):
+        future = Future()
+        writer.queue.put((add_conversation, (f"q{i}",), {}, future))
+        futures.append(future)
+    writer.shutdown()
+
+    assert all(future.done() and future.exception() is None for future in futures)
+    assert stored_session_ids() == ["q0", "q1", "q2"]
+
+
+def test_read_executor_counts_failures_separately():
+    executor = DBExecutor("test", 1)
+
+    def boom(db):
+        raise ValueError("sorgu hatası")
+
+    async def scenario():
+        assert await executor.run(lambda db: 42) == 42
+        with pytest.raises(ValueError):
+            await executor.run(boom)
+
+    try:
+        asyncio.run(scenario())
+        assert executor.stats() == {"threads": 1, "pending": 0, "completed": 1, "failed": 1}
+    finally:
+        executor.shutdown()
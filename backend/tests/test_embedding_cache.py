@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pytest
+
+from embedding_cache import KEY_BYTES, DiskVectorStore, EmbeddingCache, embedding_key
+
+VECTORS = {f"metin {i}": [i + 0.25, -i / 3, 1e-3 * i, 0.5] for i in range(5)}
+
+
+def items():
+    return [(embedding_key(text), vector) for text, vector in VECTORS.items()]
+
+
+def test_float32_round_trip_is_exact(tmp_path):
+    store = DiskVectorStore(str(tmp_path), "float32")
+    store.put_many(items())
+    for key, vector in items():
+        assert store.get(key) == np.asarray(vector, dtype=np.float32).tolist()
+
+
+def test_float16_round_trip_within_half_precision(tmp_path):
+    store = DiskVectorStore(str(tmp_path), "float16")
+    store.put_many(items())
+    assert os.path.getsize(tmp_path / "vectors.bin") == len(VECTORS) * 4 * 2
+    for key, vector in items():
+        assert store.get(key) == pytest.approx(vector, rel=1e-3, abs=1e-4)
+
+
+def test_reopen_keeps_dim_and_dtype(tmp_path):
+    DiskVectorStore(str(tmp_path), "float32").put_many(items())
+    # Açılışta istenen dtype değil, meta.json'daki kullanılır
+    store = DiskVectorStore(str(tmp_path), "float16")
+    assert (store.dim, store.dtype_name, len(store)) == (4, "float32", len(VECTORS))
+    key, vector = items()[2]
+    assert store.get(key) == np.asarray(vector, dtype=np.float32).tolist()
+
+
+def test_reopen_truncates_torn_trailing_row(tmp_path):
+    DiskVectorStore(str(tmp_path), "float32").put_many(items()[:3])
+    # Çökme: son satırın anahtarı tam, vektörü yarım yazılmış
+    with open(tmp_path / "keys.bin", "ab") as f:
+        f.write(embedding_key("yarım"))
+    with open(tmp_path / "vectors.bin", "ab") as f:
+        f.write(b"\x00" * 6)
+
+    store = DiskVectorStore(str(tmp_path), "float32")
+    assert len(store) == 3
+    assert store.get(embedding_key("yarım")) is None
+    assert os.path.getsize(tmp_path / "keys.bin") == 3 * KEY_BYTES
+    assert os.path.getsize(tmp_path / "vectors.bin") == 3 * 4 * 4
+
+    # Kesilen kuyruğun üzerine yazılan satırlar hizalı kalır
+    store.put_many(items()[3:])
+    reopened = DiskVectorStore(str(tmp_path), "float32")
+    assert len(reopened) == len(VECTORS)
+    for key, vector in items():
+        assert reopened.get(key) == np.asarray(vector, dtype=np.float32).tolist()
+
+
+def test_rows_appended_after_first_read_are_visible(tmp_path):
+    store = DiskVectorStore(str(tmp_path), "float32")
+    first, *rest = items()
+    store.put_many([first])
+    assert store.get(first[0]) is not None
+    store.put_many(rest)
+    assert store.get(rest[-1][0]) == np.asarray(rest[-1][1], dtype=np.float32).tolist()
+
+
+def test_mismatched_dimension_is_skipped(tmp_path):
+    store = DiskVectorStore(str(tmp_path), "float32")
+    store.put_many([(embedding_key("a"), [1.0, 2.0]), (embedding_key("b"), [1.0, 2.0, 3.0])])
+    assert len(store) == 1
+    assert store.get(embedding_key("b")) is None
+
+
+def test_cache_promotes_disk_hits_into_memory(tmp_path):
+    texts = list(VECTORS)
+    EmbeddingCache("model/a", directory=str(tmp_path), dtype="float32").put_many(texts, list(VECTORS.values()))
+
+    cache = EmbeddingCache("model/a", max_entries=2, directory=str(tmp_path), dtype="float32")
+    assert cache.get_many(texts[:1] + ["yok"])[1] is None
+    assert cache.disk_hits == 1 and cache.misses == 1
+    cache.get_many(texts[:1])
+    assert cache.memory_hits == 1
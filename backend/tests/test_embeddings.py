@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+import database
+from database import EmbeddingError, embed_documents
+from embedding_cache import EmbeddingCache
+
+
+def vector_for(text):
+    return [float(len(text)), float(sum(map(ord, text)) % 97)]
+
+
+class StubClient:
+    """request_embeddings yerine geçer; fail_times[metin] kadar o metni içeren parça hata verir"""
+
+    def __init__(self, fail_times=None, delays=None):
+        self.fail_times = dict(fail_times or {})
+        self.delays = delays or {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self._lock:
+            self.calls.append(list(texts))
+            failing = [text for text in texts if self.fail_times.get(text, 0) > 0]
+            for text in failing:
+                self.fail_times[text] -= 1
+        time.sleep(max(self.delays.get(text, 0) for text in texts))
+        if failing:
+            raise ConnectionError(f"geçici hata: {failing[0]}")
+        return [vector_for(text) for text in texts]
+
+
+@pytest.fixture(autouse=True)
+def embedding_env(monkeypatch):
+    monkeypatch.setattr(database, "embedding_cache", EmbeddingCache("test"))
+    monkeypatch.setattr(database, "EMBEDDING_CHUNK_SIZE", 2)
+    monkeypatch.setattr(database, "EMBEDDING_MAX_RETRIES", 2)
+    monkeypatch.setattr(database, "EMBEDDING_RETRY_BACKOFF", 0)
+
+
+def use_client(monkeypatch, client):
+    monkeypatch.setattr(database, "request_embeddings", client)
+    return client
+
+
+def test_order_is_preserved_across_chunks(monkeypatch):
+    texts = [f"sorun {i}" for i in range(7)]
+    # İlk parçalar en geç biter: sonuçlar tamamlanma sırasına göre dizilmemeli
+    client = use_client(monkeypatch, StubClient(delays={texts[0]: 0.05, texts[2]: 0.03}))
+
+    assert embed_documents(texts) == [vector_for(text) for text in texts]
+    assert sorted(len(chunk) for chunk in client.calls) == [1, 2, 2, 2]
+
+
+def test_duplicates_and_cached_texts_are_not_requested_again(monkeypatch):
+    client = use_client(monkeypatch, StubClient())
+    embed_documents(["a", "b"])
+    client.calls.clear()
+
+    assert embed_documents(["b", "c", "c", "a"]) == [vector_for(t) for t in ["b", "c", "c", "a"]]
+    assert client.calls == [["c"]]
+
+
+def test_transient_error_is_retried(monkeypatch):
+    client = use_client(monkeypatch, StubClient(fail_times={"x2": 1}))
+    texts = ["x0", "x1", "x2", "x3"]
+
+    assert embed_documents(texts) == [vector_for(text) for text in texts]
+    # Hatalı parça bir kez daha istendi, diğer parça tekrar istenmedi
+    assert client.calls.count(["x2", "x3"]) == 2
+    assert client.calls.count(["x0", "x1"]) == 1
+
+
+def test_exhausted_retries_raise_without_fake_vectors(monkeypatch):
+    client = use_client(monkeypatch, StubClient(fail_times={"y2": 10}))
+    texts = ["y0", "y1", "y2", "y3"]
+
+    with pytest.raises(EmbeddingError, match="2/4"):
+        embed_documents(texts)
+    assert client.calls.count(["y2", "y3"]) == 3  # ilk deneme + EMBEDDING_MAX_RETRIES
+
+    # Başarılı parça önbellekte, başarısız parça için hiçbir vektör (sıfır dahil) saklanmadı
+    assert database.embedding_cache.get_many(texts) == [vector_for("y0"), vector_for("y1"), None, None]
+
+
+def test_wrong_number_of_vectors_is_an_error(monkeypatch):
+    use_client(monkeypatch, lambda texts: [[1.0]])
+    with pytest.raises(EmbeddingError):
+        embed_documents(["p", "q"])
@@ -0,0 +1,137 @@
+from datetime import datetime
+
+import pytest
+
+from issue_clusters import IssueClusterer, issue_time
+
+TS = datetime(2026, 3, 5, 14, 30).timestamp()
+
+
+def meta(**extra):
+    return {"ts": TS, "category": "İnternet", **extra}
+
+
+@pytest.fixture
+def clusterer():
+    return IssueClusterer(threshold=0.8, max_clusters=3)
+
+
+def test_similar_vectors_join_the_same_cluster(clusterer):
+    clusterer.add(["a"], [[1.0, 0.0, 0.0]], ["internet kesiliyor"], [meta()])
+    # cos ≈ 0.98 > 0.8
+    clusterer.add(["b"], [[1.0, 0.2, 0.0]], ["internet sürekli kesiliyor"], [meta()])
+
+    assert clusterer.assignments == {"a": 0, "b": 0}
+    assert clusterer.clusters[0].size == 2
+
+
+def test_vector_below_threshold_opens_new_cluster(clusterer):
+    clusterer.add(["a"], [[1.0, 0.0, 0.0]], [None], [meta()])
+    # cos ≈ 0.71 < 0.8
+    clusterer.add(["b"], [[1.0, 1.0, 0.0]], [None], [meta()])
+
+    assert clusterer.assignments == {"a": 0, "b": 1}
+    assert clusterer.centroids.shape == (2, 3)
+
+
+def test_clusters_opened_in_same_batch_are_considered(clusterer):
+    clusterer.add(
+        ["a", "b", "c"],
+        [[0.0, 1.0, 0.0], [0.0, 1.0, 0.1], [0.0, 0.0, 1.0]],
+        [None, None, None],
+        [meta(), meta(), meta()]
+    )
+    assert clusterer.assignments == {"a": 0, "b": 0, "c": 1}
+
+
+def test_centroid_moves_toward_members_and_stays_unit_length(clusterer):
+    clusterer.add(["a", "b"], [[1.0, 0.0, 0.0], [1.0, 0.3, 0.0]], [None, None], [meta(), meta()])
+    centroid = clusterer.centroids[0]
+    assert centroid[1] > 0
+    assert float((centroid ** 2).sum()) == pytest.approx(1.0)
+
+
+def test_full_clusterer_assigns_to_nearest_cluster(clusterer):
+    clusterer.add(
+        ["x", "y", "z"],
+        [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]],
+        [None] * 3,
+        [meta()] * 3
+    )
+    # Eşik altında ama yeni küme açılamaz: en yakın kümeye düşer
+    clusterer.add(["w"], [[0.5, 0.6, 0.4]], [None], [meta()])
+
+    assert len(clusterer.clusters) == 3
+    assert clusterer.assignments["w"] == 1
+
+
+def test_known_ids_and_other_dimensions_are_skipped(clusterer):
+    assert clusterer.add(["a"], [[1.0, 0.0]], [None], [meta()]) == 1
+    assert clusterer.add(["a"], [[0.0, 1.0]], [None], [meta()]) == 0
+    assert clusterer.add(["b"], [[1.0, 0.0, 0.0]], [None], [meta()]) == 0
+    assert clusterer.clusters[0].size == 1
+
+
+def test_daily_counts_and_labels(clusterer):
+    clusterer.add(
+        ["a", "b"],
+        [[1.0, 0.0], [1.0, 0.1]],
+        ["Fatura tutarı yüksek geldi", "Fatura tutarı yanlış"],
+        [meta(category="Fatura"), meta(category="Fatura")]
+    )
+    [top] = clusterer.top_clusters(day=datetime.fromtimestamp(TS).date())
+
+    assert top["count"] == 2
+    assert top["top_category"] == "Fatura"
+    assert top["label"].startswith("fatura / tutarı")
+    assert clusterer.top_clusters(day=datetime(2026, 3, 6).date()) == []
+
+
+def test_issue_time_sources():
+    assert issue_time({"ts": TS}) == datetime.fromtimestamp(TS)
+    assert issue_time({"timestamp": "2026-03-05T14:30:00"}) == datetime(2026, 3, 5, 14, 30)
+    assert issue_time({"date": "bozuk", "timestamp": None}) is None
+    assert issue_time(None) is None
+
+
+def test_vector_without_time_is_clustered_but_not_counted_in_recency(clusterer):
+    clusterer.add(["a"], [[1.0, 0.0]], ["modem arızası"], [{"category": "İnternet"}])
+    cluster = clusterer.clusters[0]
+
+    assert cluster.size == 1
+    assert not cluster.daily and not cluster.hourly
+    assert cluster.summary(datetime.now())["last_24h"] == 0
+
+
+class PagedCollection:
+    def __init__(self, rows, fail_at=None):
+        self.rows = rows
+        self.fail_at = fail_at
+
+    def get(self, include, limit, offset):
+        if self.fail_at is not None and offset >= self.fail_at:
+            raise RuntimeError("chroma okunamadı")
+        page = self.rows[offset:offset + limit]
+        return {
+            "ids": [row[0] for row in page],
+            "embeddings": [row[1] for row in page],
+            "documents": [None for _ in page],
+            "metadatas": [meta() for _ in page]
+        }
+
+
+def test_bootstrap_marks_ready_on_success(clusterer, monkeypatch):
+    monkeypatch.setattr("issue_clusters.CLUSTER_BOOTSTRAP_PAGE", 2)
+    rows = [(f"i{n}", [1.0, n / 10]) for n in range(5)]
+
+    assert clusterer.bootstrap(PagedCollection(rows)) == 5
+    assert clusterer.ready and clusterer.error is None
+
+
+def test_bootstrap_failure_is_not_ready(clusterer, monkeypatch):
+    monkeypatch.setattr("issue_clusters.CLUSTER_BOOTSTRAP_PAGE", 2)
+    rows = [(f"i{n}", [1.0, n / 10]) for n in range(5)]
+
+    clusterer.bootstrap(PagedCollection(rows, fail_at=2))
+    assert not clusterer.ready
+    assert clusterer.stats()["error"] == "chroma okunamadı"
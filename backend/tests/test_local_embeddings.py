@@ -0,0 +1,35 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from local_embeddings import LocalEmbeddingBackend
+
+
+def test_pool_is_created_on_first_use_only():
+    backend = LocalEmbeddingBackend(workers=1)
+    try:
+        assert backend.pool is None
+        assert multiprocessing.active_children() == []
+    finally:
+        backend.close()
+
+
+def test_closed_backend_rejects_requests():
+    backend = LocalEmbeddingBackend(workers=1)
+    backend.close()
+    with pytest.raises(RuntimeError):
+        backend.embed(["merhaba"])
+
+
+def create_pool_in_child() -> str:
+    try:
+        LocalEmbeddingBackend(workers=1)._get_pool()
+    except RuntimeError as e:
+        return str(e)
+    return "pool created"
+
+
+def test_worker_process_cannot_start_nested_pool():
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        assert "worker process" in pool.submit(create_pool_in_child).result(timeout=60)
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from sqlalchemy import and_, or_, select
+
+import migrations
+from database import Conversation, engine
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+def plans_for(monkeypatch, shapes):
+    monkeypatch.setattr(migrations, "admin_query_shapes", lambda: shapes)
+    return {result["query"]: result for result in migrations.check_query_plans(engine)}
+
+
+def test_filtered_query_walking_whole_index_is_flagged(monkeypatch):
+    plans = plans_for(monkeypatch, {
+        "or_cursor": select(Conversation).where(or_(
+            Conversation.timestamp < NOW,
+            and_(Conversation.timestamp == NOW, Conversation.id < 10)
+        )).order_by(Conversation.timestamp.desc(), Conversation.id.desc()).limit(51)
+    })
+    assert any(step.startswith("SCAN") and "USING" in step for step in plans["or_cursor"]["plan"])
+    assert plans["or_cursor"]["uses_index"] is False
+
+
+def test_range_search_passes(monkeypatch):
+    plans = plans_for(monkeypatch, {
+        "range": select(Conversation).where(Conversation.timestamp >= NOW)
+    })
+    assert plans["range"]["plan"][0].startswith("SEARCH")
+    assert plans["range"]["uses_index"] is True
+
+
+def test_unfiltered_ordered_limit_may_scan_index(monkeypatch):
+    plans = plans_for(monkeypatch, {
+        "first_page": select(Conversation).order_by(Conversation.timestamp.desc()).limit(51),
+        "full_table": select(Conversation.customer_message)
+    })
+    assert plans["first_page"]["uses_index"] is True
+    assert plans["full_table"]["uses_index"] is False
+
+
+def test_admin_query_shapes_use_indexes():
+    failing = [result for result in migrations.check_query_plans(engine) if not result["uses_index"]]
+    assert failing == []
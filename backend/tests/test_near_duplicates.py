@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+import near_duplicates
+from near_duplicates import NearDuplicateIndex, normalize_issue_text
+
+OUTAGE = "Merhaba, iki gündür internetim yok, modem ışıkları yanıp sönüyor, lütfen yardım edin"
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(near_duplicates.time, "time", fake)
+    return fake
+
+
+def jaccard(index, a, b):
+    def shingles(text):
+        padded = f" {normalize_issue_text(text)} "
+        return {padded[i:i + index.shingle] for i in range(len(padded) - index.shingle + 1)}
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_normalization_ignores_case_accents_digits_and_stretching():
+    assert normalize_issue_text("İNTERNETİM YOOOKKK!!! 3 gündür") == normalize_issue_text("internetim yok 5 gundur")
+    assert normalize_issue_text("IŞIK") == "isik"
+
+
+def test_signature_is_deterministic_and_short_text_is_skipped():
+    a, b = NearDuplicateIndex(), NearDuplicateIndex()
+    assert np.array_equal(a.signature(OUTAGE), b.signature(OUTAGE))
+    assert a.signature("yok") is None
+    assert a.match("yok", "k1") is None
+    assert a.stats()["skipped_short"] == 1
+
+
+def test_minhash_estimate_tracks_true_jaccard():
+    index = NearDuplicateIndex(num_perm=256, bands=32)
+    other = OUTAGE.replace("iki gündür", "dünden beri").replace("lütfen", "acil")
+    estimate = float(np.count_nonzero(index.signature(OUTAGE) == index.signature(other))) / index.num_perm
+    assert abs(estimate - jaccard(index, OUTAGE, other)) < 0.1
+
+
+def test_near_copy_matches_canonical():
+    index = NearDuplicateIndex(threshold=0.8)
+    assert index.match(OUTAGE, "c1") is None
+    group = index.match(OUTAGE.upper() + "!!", "c2")
+    assert group is not None and group.key == "c1" and group.duplicates == 1
+    assert index.stats()["duplicates"] == 1
+
+
+def test_texts_below_threshold_do_not_match():
+    index = NearDuplicateIndex(threshold=0.8)
+    index.match(OUTAGE, "c1")
+    assert index.match("Faturama fazladan roaming ücreti yansıtılmış, iade istiyorum", "c2") is None
+    assert index.stats()["entries"] == 2
+
+
+@pytest.mark.parametrize("threshold, expected", [(0.3, True), (0.95, False)])
+def test_threshold_decides_borderline_pairs(threshold, expected):
+    index = NearDuplicateIndex(threshold=threshold, num_perm=256, bands=64)
+    variant = OUTAGE.replace("modem ışıkları yanıp sönüyor", "teknik servis hâlâ aramadı")
+    assert 0.3 < jaccard(index, OUTAGE, variant) < 0.95
+    index.match(OUTAGE, "c1")
+    assert (index.match(variant, "c2") is not None) is expected
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_perm=100, bands=16)
+
+
+def test_entries_expire_after_ttl(clock):
+    index = NearDuplicateIndex(ttl_seconds=60)
+    index.match(OUTAGE, "c1")
+    clock.now += 61
+    assert index.match(OUTAGE, "c2") is None
+    assert index.get("c1") is None and index.get("c2") is not None
+    assert index.stats()["evicted"] == 1
+
+
+def test_matches_extend_ttl(clock):
+    index = NearDuplicateIndex(ttl_seconds=60)
+    index.match(OUTAGE, "c1")
+    clock.now += 50
+    assert index.match(OUTAGE, "c2").key == "c1"
+    clock.now += 50
+    assert index.match(OUTAGE, "c3").key == "c1"
+
+
+def test_max_entries_evicts_least_recently_seen(clock):
+    index = NearDuplicateIndex(max_entries=2)
+    texts = [f"{word} hizmetinde sorun yaşıyorum, çözüm bekliyorum" for word in ("Fatura", "Roaming", "Modem")]
+    for i, text in enumerate(texts):
+        clock.now += 1
+        index.match(text, f"c{i}")
+    clock.now += 1
+    index.match("tamamen farklı bir konu hakkında bilgi almak istiyorum", "c3")
+    assert index.get("c0") is None
+    assert len(index.groups(min_duplicates=0)) == 2
+
+
+def test_growing_transcript_does_not_match_its_own_snapshot(clock):
+    index = NearDuplicateIndex(ttl_seconds=60)
+    transcript = OUTAGE
+    assert index.match(transcript, "snap1", source="room-1") is None
+    for i in range(2, 6):
+        clock.now += 30
+        transcript += f"\nTemsilci: kontrol ediyorum {i}"
+        assert index.match(transcript, f"snap{i}", source="room-1") is None
+
+    # Oda başına sadece en son anlık görüntü tutulur
+    assert [g.key for g in index._groups.values()] == ["snap5"]
+    assert index.stats()["duplicates"] == 0
+
+
+def test_other_sources_still_match_a_room_snapshot():
+    index = NearDuplicateIndex()
+    index.match(OUTAGE, "snap1", source="room-1")
+    group = index.match(OUTAGE, "other", source="room-2")
+    assert group is not None and group.key == "snap1"
+    assert index.match(OUTAGE, "manual") is not None
+
+
+def test_attach_analysis_and_embeddings():
+    index = NearDuplicateIndex()
+    index.match(OUTAGE, "c1")
+    index.attach_analysis("c1", {"sentiment": 3})
+    index.attach_embeddings(["c1", "unknown"], [[0.1, 0.2], [0.3, 0.4]])
+    group = index.match(OUTAGE, "c2")
+    assert group.analysis == {"sentiment": 3}
+    assert group.embedding == [0.1, 0.2]
+    assert index.groups()[0]["has_embedding"] is True
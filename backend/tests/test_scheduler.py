@@ -0,0 +1,115 @@
+import asyncio
+
+from scheduler import LatestWinsScheduler
+
+
+def run(scenario):
+    return asyncio.run(scenario())
+
+
+def test_debounce_coalesces_bursts_into_one_run():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = []
+
+        async def job():
+            started.append(loop.time())
+
+        scheduler = LatestWinsScheduler(job, debounce=0.05, max_wait=1.0)
+        for _ in range(5):
+            scheduler.schedule()
+            last = loop.time()
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.15)
+        return scheduler, started, last
+
+    scheduler, started, last = run(scenario)
+    assert scheduler.runs == 1
+    assert scheduler.coalesced == 4
+    assert started[0] - last >= 0.045
+
+
+def test_max_wait_bounds_the_delay_under_constant_input():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = []
+
+        async def job():
+            started.append(loop.time())
+
+        scheduler = LatestWinsScheduler(job, debounce=0.1, max_wait=0.2)
+        first = loop.time()
+        # Debounce süresinden sık gelen istekler tek başına işi sonsuza kadar ertelerdi
+        for _ in range(12):
+            scheduler.schedule()
+            await asyncio.sleep(0.04)
+        scheduler.cancel()
+        return started, first
+
+    started, first = run(scenario)
+    assert started, "max_wait dolunca iş çalışmalıydı"
+    assert started[0] - first < 0.3
+    assert len(started) >= 2
+
+
+def test_requests_during_a_run_trigger_one_follow_up():
+    async def scenario():
+        events = []
+        release = asyncio.Event()
+
+        async def job():
+            events.append("start")
+            await release.wait()
+            events.append("end")
+
+        scheduler = LatestWinsScheduler(job, debounce=0.01, max_wait=0.05)
+        scheduler.schedule()
+        await asyncio.sleep(0.03)
+        assert scheduler.busy
+
+        for _ in range(3):
+            scheduler.schedule()
+            await asyncio.sleep(0.02)
+        assert scheduler.runs == 1  # çalışan iş bekletilmez ve ikinci kopya başlamaz
+
+        release.set()
+        await asyncio.sleep(0.05)
+        return scheduler, events
+
+    scheduler, events = run(scenario)
+    assert scheduler.runs == 2
+    assert events == ["start", "end", "start", "end"]
+
+
+def test_job_errors_do_not_stop_the_scheduler():
+    async def scenario():
+        calls = []
+
+        async def job():
+            calls.append(1)
+            raise RuntimeError("boom")
+
+        scheduler = LatestWinsScheduler(job, debounce=0.01)
+        scheduler.schedule()
+        await asyncio.sleep(0.03)
+        scheduler.schedule()
+        await asyncio.sleep(0.03)
+        return calls
+
+    assert len(run(scenario)) == 2
+
+
+def test_cancel_drops_pending_run():
+    async def scenario():
+        calls = []
+
+        async def job():
+            calls.append(1)
+
+        scheduler = LatestWinsScheduler(job, debounce=0.03)
+        scheduler.schedule()
+        scheduler.cancel()
+        await asyncio.sleep(0.06)
+        return calls
+
+    assert run(scenario) == []
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+import similar_issues
+from similar_issues import SimilarIssueSearch, build_where
+
+
+class StubSearch:
+    """find_similar_issues yerine geçer; gate açılana kadar bekler"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.calls = []
+
+    def __call__(self, text, n_results=5, where=None):
+        self.calls.append((text, n_results, where))
+        self.gate.wait(5)
+        return {
+            "ids": [[f"conv_{len(self.calls)}"]],
+            "documents": [[text]],
+            "metadatas": [[{"category": "Fatura"}]],
+            "distances": [[0.123456]]
+        }
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = StubSearch()
+    monkeypatch.setattr(similar_issues, "find_similar_issues", stub)
+    yield stub
+    stub.gate.set()
+
+
+def make_search(ttl_seconds=300, max_entries=16, timeout_ms=50):
+    return SimilarIssueSearch(max_entries=max_entries, ttl_seconds=ttl_seconds, timeout_ms=timeout_ms, workers=2)
+
+
+def test_build_where_without_filters():
+    assert build_where() is None
+    assert build_where(category="") is None
+
+
+def test_build_where_single_filter_is_not_wrapped():
+    assert build_where(category="Fatura") == {"category": "Fatura"}
+    assert build_where(resolved=False) == {"is_resolved": False}
+
+
+def test_build_where_combines_filters_with_and():
+    start = datetime(2026, 3, 1)
+    end = datetime(2026, 3, 8)
+    assert build_where(category="Roaming", resolved=True, start=start, end=end) == {"$and": [
+        {"category": "Roaming"},
+        {"is_resolved": True},
+        {"ts": {"$gte": start.timestamp()}},
+        {"ts": {"$lte": end.timestamp()}}
+    ]}
+
+
+def test_build_where_open_ended_range():
+    start = datetime(2026, 3, 1)
+    assert build_where(start=start) == {"ts": {"$gte": start.timestamp()}}
+
+
+def test_second_search_is_a_cache_hit(stub):
+    search = make_search()
+    first = asyncio.run(search.search("internet  yavaş", limit=3))
+    second = asyncio.run(search.search(" internet yavaş ", limit=3))
+
+    assert first["results"] == [
+        {"id": "conv_1", "text": "internet yavaş", "distance": 0.1235, "metadata": {"category": "Fatura"}}
+    ]
+    assert not first["cached"] and second["cached"]
+    assert second["results"] == first["results"]
+    assert len(stub.calls) == 1
+
+
+def test_timeout_without_cache_returns_empty_and_fills_cache_later(stub):
+    search = make_search()
+    stub.gate.clear()
+    response = asyncio.run(search.search("fatura itirazı"))
+
+    assert response["timed_out"] and not response["stale"]
+    assert response["results"] == []
+    stub.gate.set()
+    response["pending"].result(timeout=5)
+
+    cached = asyncio.run(search.search("fatura itirazı"))
+    assert cached["cached"] and not cached["timed_out"]
+    assert cached["results"][0]["id"] == "conv_1"
+    assert search.timeouts == 1
+
+
+def test_timeout_with_expired_entry_returns_stale_results(stub):
+    search = make_search(ttl_seconds=0)
+    fresh = asyncio.run(search.search("roaming ücreti"))
+    stub.gate.clear()
+    response = asyncio.run(search.search("roaming ücreti"))
+
+    assert response["timed_out"] and response["stale"] and response["cached"]
+    assert response["results"] == fresh["results"]
+    assert search.stale_hits == 1
+
+
+def test_concurrent_identical_searches_share_one_lookup(stub):
+    search = make_search(timeout_ms=20)
+    stub.gate.clear()
+
+    async def scenario():
+        return await asyncio.gather(search.search("modem arızası"), search.search("modem  arızası"))
+
+    first, second = asyncio.run(scenario())
+    assert first["pending"] is second["pending"]
+    stub.gate.set()
+    first["pending"].result(timeout=5)
+    assert len(stub.calls) == 1
+
+
+def test_lru_evicts_oldest_query(stub):
+    search = make_search(max_entries=2)
+    for text in ["a sorunu", "b sorunu", "c sorunu"]:
+        asyncio.run(search.search(text))
+
+    assert search.stats()["entries"] == 2
+    assert asyncio.run(search.search("b sorunu"))["cached"]
+    assert not asyncio.run(search.search("a sorunu"))["cached"]
+    assert len(stub.calls) == 4
+
+
+def test_failed_lookup_is_not_cached(monkeypatch):
+    monkeypatch.setattr(similar_issues, "find_similar_issues", lambda *args, **kwargs: None)
+    search = make_search()
+    response = asyncio.run(search.search("hata"))
+
+    assert response["results"] == [] and not response["timed_out"]
+    assert search.errors == 1
+    assert search.stats()["entries"] == 0
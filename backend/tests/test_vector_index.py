@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+import vector_index
+from database import EmbeddingError, PendingEmbedding, SessionLocal
+from vector_index import VectorIndexer
+
+
+class FlakyEmbedder:
+    """failing=True iken her çağrıda EmbeddingError fırlatır"""
+
+    def __init__(self):
+        self.failing = True
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        if self.failing:
+            raise EmbeddingError("gateway kapalı")
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class FakeCollection:
+    def __init__(self):
+        self.rows = {}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        for issue_id, embedding in zip(ids, embeddings):
+            self.rows[issue_id] = embedding
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    embedder = FlakyEmbedder()
+    monkeypatch.setattr(vector_index, "embed_documents", embedder)
+    return embedder
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(vector_index, "issues_collection", collection)
+    return collection
+
+
+@pytest.fixture
+def pending_table():
+    session = SessionLocal()
+    session.query(PendingEmbedding).delete()
+    session.commit()
+    session.close()
+
+
+def pending_rows():
+    session = SessionLocal()
+    try:
+        return {row.issue_id: row.attempts for row in session.query(PendingEmbedding)}
+    finally:
+        session.close()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_failed_issue_is_deferred_then_drained_by_pending_sweep(embedder, collection, pending_table):
+    indexer = VectorIndexer(batch_size=8, window_ms=0, max_retries=2, retry_backoff=0.01, pending_interval=0.5)
+    notified = []
+    indexer.add_listener(lambda ids, embeddings, documents, metadatas: notified.extend(ids))
+    try:
+        indexer.enqueue("conv_1", "internet kesiliyor", {"category": "İnternet"})
+        assert indexer.flush(timeout=5)
+
+        # İlk deneme + 2 yeniden deneme, sonra tabloya bekletilir
+        assert embedder.calls == 3
+        assert indexer.failed_batches == 3
+        assert indexer.deferred == 1
+        assert pending_rows() == {"conv_1": 3}
+        assert collection.rows == {}
+
+        embedder.failing = False
+        assert wait_until(lambda: "conv_1" in collection.rows)
+        assert wait_until(lambda: pending_rows() == {})
+        assert notified == ["conv_1"]
+        assert indexer.indexed == 1
+    finally:
+        indexer.shutdown(timeout=5)
+
+
+def test_ready_embedding_skips_embed_call(embedder, collection, pending_table):
+    indexer = VectorIndexer(batch_size=8, window_ms=0, max_retries=0, retry_backoff=0.01, pending_interval=60)
+    try:
+        indexer.enqueue("conv_2", "fatura yüksek", {}, embedding=[0.5, 0.5])
+        assert indexer.flush(timeout=5)
+        assert embedder.calls == 0
+        assert collection.rows == {"conv_2": [0.5, 0.5]}
+    finally:
+        indexer.shutdown(timeout=5)
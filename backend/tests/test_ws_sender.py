@@ -0,0 +1,108 @@
+import asyncio
+
+from ws_sender import POLICY_COALESCE, POLICY_DISCONNECT, POLICY_DROP_OLDEST, ClientSender
+
+
+class BlockedSocket:
+    """send_json release edilene kadar bekler; kuyruk doldurulabilsin"""
+
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+        self.release = asyncio.Event()
+
+    async def send_json(self, message):
+        await self.release.wait()
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed = True
+
+
+def run(policy, messages, max_queue=3):
+    """İlk mesaj sokette takılı kalır, kalanlar kuyrukta birikir"""
+    async def scenario():
+        socket = BlockedSocket()
+        evicted = []
+        sender = ClientSender(
+            socket, "c1", max_queue=max_queue, policy=policy,
+            on_evict=lambda s, reason: evicted.append(reason)
+        )
+        sender.enqueue({"type": "pong", "n": 0})
+        await asyncio.sleep(0)
+        results = [sender.enqueue(message) for message in messages]
+        queued = [message for _, message, _ in sender.queue]
+        socket.release.set()
+        await asyncio.sleep(0.01)
+        sender.close()
+        return sender, results, queued, evicted
+
+    return asyncio.run(scenario())
+
+
+def chat(n):
+    return {"type": "new_message", "n": n}
+
+
+def status(kind, n):
+    return {"type": kind, "n": n}
+
+
+def test_no_coalescing_while_queue_has_room():
+    sender, results, queued, _ = run(POLICY_COALESCE, [status("text_added", 1), status("text_added", 2)])
+    assert all(results)
+    assert queued == [status("text_added", 1), status("text_added", 2)]
+    assert sender.coalesced == 0
+
+
+def test_coalesced_message_moves_to_the_end():
+    messages = [status("text_added", 1), chat(1), chat(2), status("text_added", 2)]
+    sender, results, queued, evicted = run(POLICY_COALESCE, messages)
+    assert all(results)
+    assert queued == [chat(1), chat(2), status("text_added", 2)]
+    assert sender.coalesced == 1
+    assert not evicted
+
+
+def test_analysis_results_are_never_coalesced():
+    manual = {"type": "analysis_result", "source": "manual"}
+    live = {"type": "analysis_result", "source": "live"}
+    sender, results, queued, _ = run(POLICY_COALESCE, [manual, live], max_queue=3)
+    assert queued == [manual, live]
+    assert sender.coalesced == 0
+
+
+def test_coalesce_evicts_status_message_instead_of_chat():
+    messages = [chat(1), status("similar_issues", 1), chat(2), chat(3)]
+    sender, results, queued, evicted = run(POLICY_COALESCE, messages)
+    assert all(results)
+    assert queued == [chat(1), chat(2), chat(3)]
+    assert sender.dropped == 1
+    assert not evicted
+
+
+def test_coalesce_disconnects_when_only_chat_is_queued():
+    sender, results, queued, evicted = run(POLICY_COALESCE, [chat(1), chat(2), chat(3), chat(4)])
+    assert results == [True, True, True, False]
+    assert evicted == ["send queue full"]
+    assert sender.closed
+
+
+def test_drop_oldest_skips_chat_messages():
+    messages = [chat(1), {"type": "analysis_partial", "n": 1}, chat(2), chat(3)]
+    sender, results, queued, evicted = run(POLICY_DROP_OLDEST, messages)
+    assert all(results)
+    assert queued == [chat(1), chat(2), chat(3)]
+    assert not evicted
+
+
+def test_drop_oldest_disconnects_instead_of_dropping_chat():
+    sender, results, _, evicted = run(POLICY_DROP_OLDEST, [chat(1), chat(2), chat(3), chat(4)])
+    assert results[-1] is False
+    assert evicted == ["send queue full"]
+
+
+def test_disconnect_policy():
+    sender, results, _, evicted = run(POLICY_DISCONNECT, [status("pong", 1)] * 4)
+    assert results == [True, True, True, False]
+    assert evicted == ["send queue full"]
@@ -0,0 +1,339 @@
+"""
+Arka plan vektör indeksleme kuyruğu (kayıt yolu embedding çağrısını beklemez)
+
+Bekleyen sorunlar boyut (VECTOR_INDEX_BATCH_SIZE) veya zaman penceresine
+(VECTOR_INDEX_WINDOW_MS) göre gruplanır; her grup tek embedding isteği ve tek
+toplu Chroma yazımı ile işlenir. Başarısız gruplar üstel bekleme ile yeniden denenir;
+denemeleri tükenen kayıtlar pending_embeddings tablosuna yazılır ve
+VECTOR_PENDING_RETRY_INTERVAL saniyede bir yeniden kuyruğa alınır.
+"""
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import heapq
+import itertools
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+from database import PendingEmbedding, SessionLocal, embed_documents, issues_collection
+
+VECTOR_INDEX_BATCH_SIZE = int(os.getenv("VECTOR_INDEX_BATCH_SIZE", "64"))
+VECTOR_INDEX_WINDOW_MS = float(os.getenv("VECTOR_INDEX_WINDOW_MS", "500"))
+VECTOR_INDEX_MAX_RETRIES = int(os.getenv("VECTOR_INDEX_MAX_RETRIES", "5"))
+VECTOR_INDEX_RETRY_BACKOFF = float(os.getenv("VECTOR_INDEX_RETRY_BACKOFF", "2"))
+VECTOR_PENDING_RETRY_INTERVAL = float(os.getenv("VECTOR_PENDING_RETRY_INTERVAL", "300"))
+
+
+class PendingIssue:
+    __slots__ = ("issue_id", "text", "metadata", "embedding", "attempts", "from_table")
+
+    def __init__(
+        self,
+        issue_id: str,
+        text: str,
+        metadata: dict,
+        from_table: bool = False,
+        embedding: Optional[List[float]] = None
+    ):
+        self.issue_id = issue_id
+        self.text = text
+        self.metadata = metadata
+        self.embedding = embedding  # Hazır vektör (ör. yakın-kopyada kanonik kaydınki): embedding çağrısı yapılmaz
+        self.attempts = 0
+        self.from_table = from_table  # pending_embeddings tablosundan yeniden kuyruğa alındı
+
+
+class VectorIndexer:
+    """Tek arka plan thread'i ile toplu embedding + Chroma yazımı"""
+
+    def __init__(
+        self,
+        batch_size: int,
+        window_ms: float,
+        max_retries: int,
+        retry_backoff: float,
+        pending_interval: float = VECTOR_PENDING_RETRY_INTERVAL
+    ):
+        self.batch_size = max(1, batch_size)
+        self.window = max(0.0, window_ms) / 1000
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.pending_interval = pending_interval
+        self._next_pending_check = time.monotonic() + pending_interval
+        self._requeued_ids = set()
+        self.queue: "queue.Queue[Optional[PendingIssue]]" = queue.Queue()
+        self._retries: List = []  # (hazır olma zamanı, sıra, PendingIssue) heap'i
+        self._retry_seq = itertools.count()
+        self._outstanding = 0
+        self._idle = threading.Condition()
+        self._stopping = False
+        self._listeners: List[Callable] = []
+
+        # Metrikler
+        self.indexed = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.deferred = 0
+        self.pending_rows = 0
+        self.last_batch_size = 0
+        self.last_batch_ms = 0.0
+
+        # Önceki çalışmadan kalan bekleyen kayıtlar açılışta kuyruğa alınır
+        self._requeue_pending()
+        self._thread = threading.Thread(target=self._run, name="vector-indexer", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, issue_id: str, issue_text: str, metadata: dict, embedding: Optional[List[float]] = None):
+        """Sorunu indeksleme kuyruğuna ekle (bloklamaz)"""
+        with self._idle:
+            self._outstanding += 1
+        self.queue.put(PendingIssue(issue_id, issue_text, metadata, embedding=embedding))
+
+    def add_listener(self, listener: Callable):
+        """Başarılı her toplu yazımdan sonra listener(ids, embeddings, documents, metadatas) çağrılır"""
+        self._listeners.append(listener)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if batch:
+                self._index(batch)
+
+    def _next_batch(self) -> Optional[List[PendingIssue]]:
+        """Hazır yeniden denemeler + kuyruktan pencere dolana kadar gelenler; durdurulunca None"""
+        now = time.monotonic()
+        if now >= self._next_pending_check and not self._stopping:
+            self._requeue_pending()
+            self._next_pending_check = now + self.pending_interval
+
+        batch = []
+        while self._retries and self._retries[0][0] <= now and len(batch) < self.batch_size:
+            batch.append(heapq.heappop(self._retries)[2])
+
+        if not batch:
+            if self._stopping:
+                return None
+            timeout = self._next_pending_check - now
+            if self._retries:
+                timeout = min(timeout, self._retries[0][0] - now)
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                return []
+            if item is None:
+                self._stopping = True
+                return []
+            batch.append(item)
+
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.batch_size and not self._stopping:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._stopping = True
+                break
+            batch.append(item)
+        return batch
+
+    def _index(self, batch: List[PendingIssue]):
+        started = time.perf_counter()
+        try:
+            missing = [item for item in batch if item.embedding is None]
+            if missing:
+                for item, embedding in zip(missing, embed_documents([item.text for item in missing])):
+                    item.embedding = embedding
+            embeddings = [item.embedding for item in batch]
+            issues_collection.upsert(
+                ids=[item.issue_id for item in batch],
+                embeddings=embeddings,
+                documents=[item.text for item in batch],
+                metadatas=[item.metadata for item in batch]
+            )
+        except Exception as e:
+            self.failed_batches += 1
+            print(f"Vector index error ({len(batch)} kayıt): {e}")
+            for item in batch:
+                self._schedule_retry(item, e)
+            return
+
+        self.batches += 1
+        self.indexed += len(batch)
+        self.last_batch_size = len(batch)
+        self.last_batch_ms = (time.perf_counter() - started) * 1000
+        self._clear_pending([item for item in batch if item.from_table])
+        self._notify(batch, embeddings)
+        self._done(len(batch))
+
+    def _notify(self, batch: List[PendingIssue], embeddings: List[List[float]]):
+        ids = [item.issue_id for item in batch]
+        documents = [item.text for item in batch]
+        metadatas = [item.metadata for item in batch]
+        for listener in self._listeners:
+            try:
+                listener(ids, embeddings, documents, metadatas)
+            except Exception as e:
+                print(f"Vector index listener error: {e}")
+
+    def _schedule_retry(self, item: PendingIssue, error: Exception):
+        item.attempts += 1
+        if item.attempts > self.max_retries or self._stopping:
+            self._defer(item, error)
+            self._done(1)
+            return
+        ready_at = time.monotonic() + self.retry_backoff * 2 ** (item.attempts - 1)
+        heapq.heappush(self._retries, (ready_at, next(self._retry_seq), item))
+
+    def _defer(self, item: PendingIssue, error: Exception):
+        """Denemeleri tükenen kaydı pending_embeddings tablosuna yaz (sonra yeniden denenecek)"""
+        self.deferred += 1
+        self._requeued_ids.discard(item.issue_id)
+        db = SessionLocal()
+        try:
+            row = db.get(PendingEmbedding, item.issue_id)
+            if row is None:
+                row = PendingEmbedding(
+                    issue_id=item.issue_id,
+                    issue_text=item.text,
+                    metadata_json=json.dumps(item.metadata, ensure_ascii=False),
+                    attempts=0
+                )
+                db.add(row)
+            row.attempts += item.attempts
+            row.last_error = str(error)[:500]
+            row.updated_at = datetime.now()
+            db.commit()
+            self.pending_rows = db.query(PendingEmbedding).count()
+            print(f"⚠️ Vector index: {item.issue_id} sonra yeniden denenmek üzere bekletildi")
+        except Exception as e:
+            db.rollback()
+            print(f"Pending embedding save error ({item.issue_id}): {e}")
+        finally:
+            db.close()
+
+    def _requeue_pending(self):
+        """pending_embeddings tablosundaki kayıtları (kuyrukta olmayanları) yeniden kuyruğa al"""
+        db = SessionLocal()
+        try:
+            rows = db.query(PendingEmbedding).order_by(PendingEmbedding.updated_at).all()
+            self.pending_rows = len(rows)
+            for row in rows:
+                if row.issue_id in self._requeued_ids:
+                    continue
+                self._requeued_ids.add(row.issue_id)
+                with self._idle:
+                    self._outstanding += 1
+                self.queue.put(PendingIssue(
+                    row.issue_id,
+                    row.issue_text,
+                    json.loads(row.metadata_json) if row.metadata_json else {},
+                    from_table=True
+                ))
+        except Exception as e:
+            print(f"Pending embedding load error: {e}")
+        finally:
+            db.close()
+
+    def _clear_pending(self, items: List[PendingIssue]):
+        if not items:
+            return
+        ids = [item.issue_id for item in items]
+        db = SessionLocal()
+        try:
+            db.query(PendingEmbedding).filter(PendingEmbedding.issue_id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+            self.pending_rows = max(0, self.pending_rows - len(ids))
+            self._requeued_ids.difference_update(ids)
+        except Exception as e:
+            db.rollback()
+            print(f"Pending embedding cleanup error: {e}")
+        finally:
+            db.close()
+
+    def _done(self, count: int):
+        with self._idle:
+            self._outstanding -= count
+            if self._outstanding <= 0:
+                self._idle.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Kuyruktaki tüm kayıtlar indekslenene (veya tabloya bekletilene) kadar bekle"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding <= 0, timeout=timeout)
+
+    def shutdown(self, timeout: Optional[float] = 10.0):
+        """Bekleyenleri yazmayı dene, sonra thread'i durdur"""
+        self.flush(timeout)
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict:
+        return {
+            "queue_depth": self.queue.qsize() + len(self._retries),
+            "retry_pending": len(self._retries),
+            "outstanding": self._outstanding,
+            "indexed": self.indexed,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "deferred": self.deferred,
+            "pending_table": self.pending_rows,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_ms": round(self.last_batch_ms, 2),
+            "batch_size": self.batch_size,
+            "window_ms": self.window * 1000
+        }
+
+
+vector_indexer = VectorIndexer(
+    VECTOR_INDEX_BATCH_SIZE,
+    VECTOR_INDEX_WINDOW_MS,
+    VECTOR_INDEX_MAX_RETRIES,
+    VECTOR_INDEX_RETRY_BACKOFF
+)
+
+
+def reindex_conversations() -> int:
+    """Tüm konuşmaları yeniden indeksle (embedding havuzu sayesinde paralel parçalarla)"""
+    from database import Conversation
+
+    db = SessionLocal()
+    try:
+        count = 0
+        for conversation in db.query(Conversation).filter(
+            Conversation.customer_message.isnot(None),
+            Conversation.customer_message != ""
+        ).yield_per(500):
+            vector_indexer.enqueue(
+                f"conv_{conversation.id}",
+                conversation.customer_message,
+                {
+                    "session_id": conversation.session_id or "",
+                    "timestamp": conversation.timestamp.isoformat(),
+                    "ts": conversation.timestamp.timestamp(),
+                    "category": conversation.category or "",
+                    "is_resolved": bool(conversation.is_resolved)
+                }
+            )
+            count += 1
+        return count
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    # python vector_index.py            -> pending_embeddings tablosundaki kayıtları yeniden dene
+    # python vector_index.py --reindex  -> tüm konuşmaları yeniden indeksle
+    started = time.perf_counter()
+    if "--reindex" in sys.argv:
+        print(f"🔄 {reindex_conversations()} konuşma kuyruğa alındı")
+    vector_indexer.flush()
+    stats = vector_indexer.stats()
+    print(f"✅ {stats['indexed']} kayıt indekslendi, {stats['pending_table']} kayıt bekliyor "
+          f"({time.perf_counter() - started:.1f}s)")
@@ -0,0 +1,153 @@
+"""
+WebSocket bağlantısı başına sınırlı giden kuyruk + gönderici task (yavaş client'lar diğerlerini bekletmesin)
+"""
+from collections import deque
+from typing import Callable, Dict, Optional
+import asyncio
+import time
+
+from fastapi import WebSocket
+
+# Kuyruk dolunca uygulanacak politikalar
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_COALESCE = "coalesce"
+POLICY_DISCONNECT = "disconnect"
+QUEUE_POLICIES = (POLICY_DROP_OLDEST, POLICY_COALESCE, POLICY_DISCONNECT)
+
+# Yalnızca en güncel hali anlamlı olan durum mesajları (kuyruk dolunca birleştirilir/atılır).
+# analyzing/analysis_result burada değil: canlı analiz sonucu bekleyen manuel sonucu ezmemeli.
+COALESCE_TYPES = {"text_added", "live_mode_changed", "stream_mode_changed", "similar_issues"}
+
+# Hiçbir politikada atılmayan mesajlar; yer açılamazsa client bağlantısı kesilir
+NEVER_DROP_TYPES = {"new_message", "analysis_result", "cleared"}
+
+
+class ClientSender:
+    """Bir WebSocket için giden mesaj kuyruğu, gönderici task ve gecikme metrikleri"""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        client_id: str,
+        max_queue: int = 256,
+        policy: str = POLICY_COALESCE,
+        send_timeout: float = 5.0,
+        on_evict: Optional[Callable[["ClientSender", str], None]] = None
+    ):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.max_queue = max_queue
+        self.policy = policy if policy in QUEUE_POLICIES else POLICY_COALESCE
+        self.send_timeout = send_timeout
+        self.on_evict = on_evict
+        self.queue: deque = deque()
+        self.closed = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+        # Metrikler
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.avg_lag_ms = 0.0
+
+    def enqueue(self, message: dict) -> bool:
+        """Mesajı kuyruğa ekle (bloklamaz). Bağlantı kapalıysa veya atıldıysa False döner."""
+        if self.closed:
+            return False
+
+        message_type = message.get("type")
+        coalesce_key = message_type if message_type in COALESCE_TYPES else None
+
+        # Politika sadece kuyruk doluyken devreye girer
+        if len(self.queue) >= self.max_queue and not self._make_room(coalesce_key):
+            self.evict("send queue full")
+            return False
+
+        self.queue.append((time.perf_counter(), message, coalesce_key))
+        self._wakeup.set()
+        return True
+
+    def _make_room(self, coalesce_key: Optional[str]) -> bool:
+        """Dolu kuyrukta politikaya göre bir mesaj çıkar; çıkarılabilecek mesaj yoksa False"""
+        if self.policy == POLICY_DISCONNECT:
+            return False
+
+        if self.policy == POLICY_COALESCE:
+            # Önce aynı tipin eski hali, yoksa en eski durum mesajı; yeni mesaj sona eklenir
+            victim = self._find(lambda key, _: key is not None and key == coalesce_key)
+            if victim is not None:
+                del self.queue[victim]
+                self.coalesced += 1
+                return True
+            victim = self._find(lambda key, _: key is not None)
+        else:
+            victim = self._find(lambda _, message: message.get("type") not in NEVER_DROP_TYPES)
+
+        if victim is None:
+            return False
+        del self.queue[victim]
+        self.dropped += 1
+        return True
+
+    def _find(self, predicate: Callable[[Optional[str], dict], bool]) -> Optional[int]:
+        for i, (_, message, key) in enumerate(self.queue):
+            if predicate(key, message):
+                return i
+        return None
+
+    async def _run(self):
+        try:
+            while True:
+                while not self.queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                enqueued_at, message, _ = self.queue.popleft()
+                await asyncio.wait_for(self.websocket.send_json(message), timeout=self.send_timeout)
+
+                lag_ms = (time.perf_counter() - enqueued_at) * 1000
+                self.sent += 1
+                self.last_lag_ms = lag_ms
+                self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+                self.avg_lag_ms = lag_ms if self.sent == 1 else self.avg_lag_ms * 0.9 + lag_ms * 0.1
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            self.evict(f"send timeout ({self.send_timeout}s)")
+        except Exception as e:
+            self.evict(f"send error: {e}")
+
+    def evict(self, reason: str):
+        """Yavaş/bozuk client'ı at: kuyruğu bırak, soketi kapat, yöneticiye bildir"""
+        if self.closed:
+            return
+        print(f"⚠️ Evicting client {self.client_id}: {reason}")
+        self.close()
+        asyncio.create_task(self._close_socket())
+        if self.on_evict is not None:
+            self.on_evict(self, reason)
+
+    async def _close_socket(self):
+        try:
+            await self.websocket.close(code=1013)
+        except Exception:
+            pass
+
+    def close(self):
+        self.closed = True
+        self.queue.clear()
+        if not self._task.done() and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def metrics(self) -> Dict:
+        return {
+            "queue_depth": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "last_lag_ms": round(self.last_lag_ms, 2),
+            "avg_lag_ms": round(self.avg_lag_ms, 2),
+            "max_lag_ms": round(self.max_lag_ms, 2)
+        }